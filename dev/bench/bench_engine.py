@@ -0,0 +1,93 @@
+"""
+Micro-benchmarks for the ConnectXMatch engine.
+
+Run from the repository root:
+    python -m dev.bench.bench_engine
+"""
+import random
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+from src.main.connect import ConnectXMatch, BatchConnectX, GameState
+
+
+GEOMETRIES: List[Tuple[int, int, int]] = [
+    (7, 6, 4),
+    (30, 30, 8),
+]
+
+
+def random_games_moves(columns: int, rows: int, win_length: int, number_of_games: int, seed: int = 0) -> List[List[int]]:
+    """ Pre-generate random legal move sequences so that the timed loop only measures the engine. """
+    rng = random.Random(seed)
+    games = []
+    for _ in range(number_of_games):
+        match = ConnectXMatch(columns, rows, win_length, "X", "O")
+        moves = []
+        while match.game_state == GameState.IN_PROGRESS:
+            column = rng.choice(match.getPossibleActions())
+            match.play_with_next_player(column)
+            moves.append(column)
+        games.append(moves)
+    return games
+
+
+def bench_make_move(columns: int, rows: int, win_length: int, number_of_games: int) -> float:
+    """ Returns the average cost of make_move in microseconds. """
+    games = random_games_moves(columns, rows, win_length, number_of_games)
+    total_moves = sum(len(moves) for moves in games)
+    start = time.perf_counter()
+    for moves in games:
+        match = ConnectXMatch(columns, rows, win_length, "X", "O")
+        for column in moves:
+            match.play_with_next_player(column)
+    elapsed = time.perf_counter() - start
+    return elapsed / total_moves * 1e6
+
+
+def bench_check_win(columns: int, rows: int, win_length: int, number_of_games: int) -> float:
+    """ Returns the average cost of a full-board check_win in microseconds, for reference. """
+    games = random_games_moves(columns, rows, win_length, number_of_games)
+    matches = []
+    for moves in games:
+        match = ConnectXMatch(columns, rows, win_length, "X", "O")
+        for column in moves[:-1]:
+            match.play_with_next_player(column)
+        matches.append(match)
+    start = time.perf_counter()
+    for match in matches:
+        match.check_win()
+    elapsed = time.perf_counter() - start
+    return elapsed / len(matches) * 1e6
+
+
+def bench_random_games(columns: int, rows: int, win_length: int, number_of_games: int) -> Tuple[float, float]:
+    """ Returns the simulated moves per second of random games, one at a time and batched. """
+    rng = random.Random(0)
+    moves = 0
+    start = time.perf_counter()
+    for _ in range(number_of_games):
+        match = ConnectXMatch(columns, rows, win_length, "X", "O")
+        while match.game_state == GameState.IN_PROGRESS:
+            match.play_with_next_player(rng.choice(match.getPossibleActions()))
+            moves += 1
+    single_moves_per_second = moves / (time.perf_counter() - start)
+
+    batch = BatchConnectX(number_of_games, columns, rows, win_length)
+    start = time.perf_counter()
+    batch.play_random_games(np.random.default_rng(0))
+    batch_moves_per_second = batch.move_counts.sum() / (time.perf_counter() - start)
+    return single_moves_per_second, batch_moves_per_second
+
+
+if __name__ == "__main__":
+    for columns, rows, win_length in GEOMETRIES:
+        number_of_games = 200 if columns * rows < 100 else 20
+        make_move_us = bench_make_move(columns, rows, win_length, number_of_games)
+        check_win_us = bench_check_win(columns, rows, win_length, number_of_games)
+        print(f"{columns}x{rows} win {win_length}: make_move {make_move_us:.2f} us/move, full check_win {check_win_us:.2f} us/call")
+    for columns, rows, win_length in GEOMETRIES:
+        single, batched = bench_random_games(columns, rows, win_length, 10000 if columns * rows < 100 else 1000)
+        print(f"{columns}x{rows} win {win_length}: random games {single:,.0f} moves/s one at a time, {batched:,.0f} moves/s batched")
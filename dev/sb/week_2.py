@@ -1,5 +1,4 @@
 import numpy as np
-import copy
 from mcts import mcts
 
 from src.main.connect import ConnectXMatch, GameState
@@ -19,18 +18,17 @@ def get_match_object(board: np.ndarray, win_length: int, player: str, opponent:
 def get_winning_move(match: ConnectXMatch, player: str) -> int:
     if match.game_state != GameState.IN_PROGRESS:
         return None
-    for column in range(match.COLUMNS):
-        match_copy: ConnectXMatch = copy.deepcopy(match)
-        match_copy.make_move(column, player)
-        if match_copy.game_state == GameState.WIN:
-            return column
+    for column in match.getPossibleActions():
+        with match.try_move(column, player):
+            if match.game_state == GameState.WIN:
+                return column
     return None
 
         
 
 def play_using_mcts(board: np.ndarray, length_to_win: int, opponent_name: str) -> int:
     match: ConnectXMatch = get_match_object(board, length_to_win, "X", opponent_name)
-    mcts_instance = mcts(timeLimit=1000)
+    mcts_instance = mcts(timeLimit=1000, rolloutPolicy=ConnectXMatch.rollout)
     bestAction = mcts_instance.search(initialState=match)
     return bestAction
 
@@ -43,6 +41,6 @@ def play(board: np.ndarray, length_to_win: int, opponent_name: str) -> int:
     winning_move_other: int = get_winning_move(match, opponent_name)
     if winning_move_other is not None:
         return winning_move_other
-    mcts_instance = mcts(timeLimit=2000)
+    mcts_instance = mcts(timeLimit=2000, rolloutPolicy=ConnectXMatch.rollout)
     bestAction = mcts_instance.search(initialState=match)
     return bestAction
\ No newline at end of file
@@ -0,0 +1,206 @@
+"""
+Run agent functions in their own child processes.
+
+Each agent gets a warm child process per parent process (for instance per pool worker), which keeps
+the agent's imports and state between moves and games. The child measures the CPU time of every
+move, so that the time limit does not depend on how many games share the machine. A separate
+wall-clock rule kills and replaces a child that does not answer within WALL_TIME_FACTOR times the
+time limit plus WALL_TIME_MARGIN_S, which is what bounds agents that sleep or wait on I/O.
+
+Children are started with subprocess rather than multiprocessing, because pool workers are
+daemonic and cannot have multiprocessing children. The agent function is pickled, so it must be
+importable by the child: a module-level function or a bound method of a picklable object.
+"""
+import atexit
+import os
+import pickle
+import queue
+import random
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple
+
+import numpy as np
+
+
+# Code run by the child: it receives the parent's sys.path first, so that it can import the agent
+_BOOTSTRAP: str = "import pickle, sys; sys.path[:0] = pickle.load(sys.stdin.buffer); from src.main.agent_process import serve; serve()"
+STARTUP_TIMEOUT_S: float = 30.0
+# Wall time a move gets before the child is killed, as a multiple of the time limit plus a margin
+WALL_TIME_FACTOR: float = 2.0
+WALL_TIME_MARGIN_S: float = 0.1
+
+
+class AgentProcess:
+    """
+    An agent function running in a child process.
+
+    Args:
+        func (Callable): The agent function, with the (board, win_length, opponent_name) signature.
+        wall_time_factor (float): A move gets this many times its time limit in wall time, plus WALL_TIME_MARGIN_S,
+            before the child is killed. The time limit itself applies to the CPU time measured in the child.
+    """
+    OK: str = "OK"
+    ERROR: str = "ERROR"
+    TIMEOUT: str = "TIMEOUT"
+    # Request to seed the random generators of the child, which does not reply to it
+    SEED: str = "SEED"
+
+    def __init__(self, func: Callable, wall_time_factor: float = WALL_TIME_FACTOR):
+        self.func: Callable = func
+        self.wall_time_factor: float = wall_time_factor
+        self.restarts: int = 0
+        # CPU time of the last move, in seconds
+        self.last_cpu_time: float = None
+        self._process: subprocess.Popen = None
+        self._replies: queue.Queue = None
+
+    @staticmethod
+    def _read_replies(stream, replies: queue.Queue) -> None:
+        try:
+            while True:
+                replies.put(pickle.load(stream))
+        except Exception:
+            # End of the stream, the child exited or was killed
+            replies.put(None)
+
+    def start(self) -> None:
+        """ Start the child process and wait until it has loaded the agent. """
+        self._process = subprocess.Popen([sys.executable, "-c", _BOOTSTRAP], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self._replies = queue.Queue()
+        threading.Thread(target=self._read_replies, args=(self._process.stdout, self._replies), daemon=True).start()
+        try:
+            pickle.dump(sys.path, self._process.stdin)
+            pickle.dump(self.func, self._process.stdin)
+            self._process.stdin.flush()
+            reply = self._replies.get(timeout=STARTUP_TIMEOUT_S)
+        except Exception as e:
+            self.stop()
+            raise Exception(f"Error, could not start the agent process: {e}")
+        if reply is None or reply[0] != self.OK:
+            self.stop()
+            raise Exception(f"Error, could not start the agent process: {None if reply is None else reply[1]}")
+
+    def stop(self) -> None:
+        if self._process is not None:
+            self._process.kill()
+            self._process.wait()
+            self._process = None
+
+    def restart(self) -> None:
+        self.stop()
+        self.restarts += 1
+        self.start()
+
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def seed(self, seed: int) -> None:
+        """ Seed random and np.random in the child before the next move, starting the child if needed. """
+        if not self.is_alive():
+            if self._process is None:
+                self.start()
+            else:
+                self.restart()
+        pickle.dump((self.SEED, seed), self._process.stdin)
+        self._process.stdin.flush()
+
+    def play(self, board, win_length: int, opponent_name: str, time_limit: float) -> Tuple[str, Any]:
+        """
+        Ask the agent for a move.
+
+        Returns:
+            Tuple[str, Any]: OK and the column, ERROR and the error message, or TIMEOUT and None.
+        """
+        try:
+            if not self.is_alive():
+                if self._process is None:
+                    self.start()
+                else:
+                    self.restart()
+            pickle.dump((board, win_length, opponent_name), self._process.stdin)
+            self._process.stdin.flush()
+        except Exception as e:
+            return self.ERROR, str(e)
+
+        try:
+            reply = self._replies.get(timeout=time_limit * self.wall_time_factor + WALL_TIME_MARGIN_S)
+        except queue.Empty:
+            # The agent keeps running otherwise, so replace it by a fresh process before the next move
+            self.last_cpu_time = None
+            self.restart()
+            return self.TIMEOUT, None
+        if reply is None:
+            self.stop()
+            return self.ERROR, "The agent process exited."
+        status, result, self.last_cpu_time = reply
+        if status == self.ERROR:
+            return self.ERROR, result
+        if self.last_cpu_time > time_limit:
+            return self.TIMEOUT, None
+        return self.OK, result
+
+
+def serve() -> None:
+    """ Main loop of the child process: load the agent, then answer move requests until the parent goes away. """
+    requests = sys.stdin.buffer
+    # Keep stdout for the replies and send anything the agent prints to stderr
+    replies = os.fdopen(os.dup(1), "wb")
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+
+    def send(reply: Tuple[str, Any, float]) -> None:
+        pickle.dump(reply, replies)
+        replies.flush()
+
+    try:
+        func = pickle.load(requests)
+    except Exception as e:
+        send((AgentProcess.ERROR, str(e), 0.0))
+        return
+    send((AgentProcess.OK, None, 0.0))
+    while True:
+        try:
+            request = pickle.load(requests)
+        except EOFError:
+            return
+        if len(request) == 2 and request[0] == AgentProcess.SEED:
+            random.seed(request[1])
+            np.random.seed(request[1])
+            continue
+        board, win_length, opponent_name = request
+        start = time.process_time()
+        try:
+            reply = (AgentProcess.OK, func(board, win_length, opponent_name))
+        except Exception as e:
+            reply = (AgentProcess.ERROR, str(e))
+        send(reply + (time.process_time() - start,))
+
+
+# Warm processes of this process, by agent name
+_agent_processes: Dict[str, AgentProcess] = {}
+
+
+def get_agent_process(name: str, func: Callable) -> AgentProcess:
+    """
+    The warm process of an agent in this process, created on first use.
+    A name that comes with another function than the one of its process, such as a copy of the agent
+    unpickled by a pool worker, gets a new process in place of the old one. Functions are compared with ==,
+    so a bound method matches another bound method of the same object, and agents are only pickled to start their process.
+    """
+    agent_process = _agent_processes.get(name)
+    if agent_process is None or agent_process.func != func:
+        if agent_process is not None:
+            agent_process.stop()
+        agent_process = AgentProcess(func)
+        _agent_processes[name] = agent_process
+    return agent_process
+
+
+@atexit.register
+def stop_agent_processes() -> None:
+    for agent_process in _agent_processes.values():
+        agent_process.stop()
+    _agent_processes.clear()
@@ -1,18 +1,20 @@
 import numpy as np
+import asyncio
 import itertools
 import tkinter as tk
 from enum import Enum
-from typing import Tuple, List, Callable
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
 import threading
-import copy
+import contextlib
+import functools
+import json
+import random
 import os
+import time
 import multiprocessing as mp
+from array import array
 
-
-from typing import Callable, List, Dict
-
-
-
+from src.main.agent_process import AgentProcess, get_agent_process
 
 
 NO_WINNER_STATE: str = "NO_CLEAR_WINNER"
@@ -38,9 +40,194 @@ class GameState(str, Enum):
 
 
 
+@functools.lru_cache(maxsize=None)
+def get_zobrist_table(columns: int, rows: int) -> Tuple[List[int], List[int]]:
+    """
+    Random 64-bit keys for every (player, cell) of a board geometry, indexed by bitboard position.
+    The generator is seeded with the geometry, so hashes are stable across processes and runs.
+    """
+    rng = random.Random(f"zobrist-{columns}x{rows}")
+    size = columns * (rows + 1)
+    return [rng.getrandbits(64) for _ in range(size)], [rng.getrandbits(64) for _ in range(size)]
+
+
+def mirror_column(column: int, columns: int) -> int:
+    """ The column of the left-right mirror image of a board. """
+    return columns - 1 - column
+
+
+def canonical_board(board: np.ndarray) -> Tuple[np.ndarray, bool]:
+    """
+    Choose one of a board and its left-right mirror image, the same one for both, so that tables
+    keyed by boards store each pair of symmetric positions once.
+    Moves chosen on a mirrored board map back with mirror_column.
+    The choice compares the bytes of the cell codes of both boards. String boards are coded by
+    the sorted player names, which are the same for a board and its mirror image.
+
+    Returns:
+        Tuple[np.ndarray, bool]: The canonical board and whether it is the mirror image of the given board.
+    """
+    if board.dtype == object:
+        codes = np.zeros(board.shape, dtype=np.int8)
+        for code, name in enumerate(sorted(set(board.ravel().tolist()) - {None}), start=1):
+            codes[board == name] = code
+    else:
+        codes = np.ascontiguousarray(board)
+    if codes[::-1].tobytes() < codes.tobytes():
+        return board[::-1], True
+    return board, False
+
+
+def numeric_observation(func: Callable) -> Callable:
+    """
+    Mark an agent function, or the function of an agent method, to receive a NumericObservation
+    instead of the string board. Agents that are not marked keep receiving string boards.
+    """
+    func.numeric_observation = True
+    return func
+
+
+def wants_numeric_observation(func: Callable) -> bool:
+    return getattr(func, "numeric_observation", False)
+
+
+class NumericObservation:
+    """
+    What an agent marked with numeric_observation receives in place of the string board.
+
+    The board is a read-only (COLUMNS, ROWS) int8 view of the engine's own buffer, not a copy:
+    1 for the pieces of the agent, -1 for the pieces of its opponent and 0 for empty cells.
+    It follows the match as moves are played, so an agent that wants to keep a position must copy it.
+    Observations sent to agent processes are pickled, which copies them.
+
+    Args:
+        board (np.ndarray): Read-only signed cell values from the point of view of the agent.
+        heights (np.ndarray): Number of pieces in each column.
+        legal_moves (np.ndarray): Whether each column can still be played.
+    """
+    def __init__(self, board: np.ndarray, heights: np.ndarray, legal_moves: np.ndarray):
+        self.board: np.ndarray = board
+        self.heights: np.ndarray = heights
+        self.legal_moves: np.ndarray = legal_moves
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.board.shape
+
+
+class LineIndex:
+    """
+    Every possible winning line of a board geometry, and the lines going through every cell.
+    Use get_line_index to get the shared instance of a geometry instead of building a new one.
+
+    Cells are numbered column * rows + row, which is the order of board.ravel() and cells.ravel()
+    for (columns, rows) arrays. The line bitmasks use the bitboard layout of ConnectXMatch,
+    where a cell is at bit column * (rows + 1) + row.
+    """
+    DIRECTIONS: List[Tuple[int, int]] = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+    def __init__(self, columns: int, rows: int, win_length: int):
+        self.COLUMNS: int = columns
+        self.ROWS: int = rows
+        self.WIN_LENGTH: int = win_length
+
+        lines = []
+        for column_step, row_step in self.DIRECTIONS:
+            for column in range(columns):
+                for row in range(rows):
+                    end_column = column + (win_length - 1) * column_step
+                    end_row = row + (win_length - 1) * row_step
+                    if 0 <= end_column < columns and 0 <= end_row < rows:
+                        lines.append([(column + step * column_step) * rows + row + step * row_step for step in range(win_length)])
+        # (number of lines, win_length) cell numbers of every line
+        self.line_cells: np.ndarray = np.array(lines, dtype=np.int32).reshape(len(lines), win_length)
+        self.line_bitmasks: List[int] = [
+            sum(1 << ((cell // rows) * (rows + 1) + cell % rows) for cell in line) for line in lines
+        ]
+
+        # Lines through every cell
+        self.cell_lines: List[List[int]] = [[] for _ in range(columns * rows)]
+        for line_number, line in enumerate(lines):
+            for cell in line:
+                self.cell_lines[cell].append(line_number)
+        # Bitmasks of the lines through every bitboard position, empty for the sentinel positions
+        self.position_bitmasks: List[List[int]] = [[] for _ in range(columns * (rows + 1))]
+        for cell, line_numbers in enumerate(self.cell_lines):
+            self.position_bitmasks[(cell // rows) * (rows + 1) + cell % rows] = [self.line_bitmasks[line_number] for line_number in line_numbers]
+        # The same lists as a (columns * rows, most lines through a cell) table padded with -1, for array lookups
+        max_lines = max((len(line_numbers) for line_numbers in self.cell_lines), default=0)
+        self.cell_lines_table: np.ndarray = np.full((columns * rows, max_lines), -1, dtype=np.int32)
+        for cell, line_numbers in enumerate(self.cell_lines):
+            self.cell_lines_table[cell, :len(line_numbers)] = line_numbers
+
+    @property
+    def number_of_lines(self) -> int:
+        return len(self.line_bitmasks)
+
+    def line_counts(self, cells: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Count the pieces of each player on every line.
+
+        Args:
+            cells (np.ndarray): (COLUMNS, ROWS) cell codes: 0 for empty, 1 for the first player and 2 for the second player.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The number of pieces of the first and of the second player on every line.
+        """
+        line_values = np.asarray(cells).ravel()[self.line_cells]
+        return (line_values == 1).sum(axis=1), (line_values == 2).sum(axis=1)
+
+    def is_win_through(self, cells: np.ndarray, column: int, row: int) -> bool:
+        """ Whether the piece at (column, row) is part of a complete line of its player. """
+        flat_cells = np.asarray(cells).ravel()
+        player_code = flat_cells[column * self.ROWS + row]
+        if player_code == 0:
+            return False
+        line_numbers = self.cell_lines[column * self.ROWS + row]
+        return bool((flat_cells[self.line_cells[line_numbers]] == player_code).all(axis=1).any())
+
+    def winning_cells(self, cells: np.ndarray, player_code: int) -> np.ndarray:
+        """
+        Find the empty cells that would complete a line for a player, whether they are playable yet or not.
+
+        Args:
+            cells (np.ndarray): (COLUMNS, ROWS) cell codes.
+            player_code (int): 1 for the first player, 2 for the second player.
+
+        Returns:
+            np.ndarray: (COLUMNS, ROWS) booleans.
+        """
+        flat_cells = np.asarray(cells).ravel()
+        line_values = flat_cells[self.line_cells]
+        threats = self.line_cells[
+            ((line_values == player_code).sum(axis=1) == self.WIN_LENGTH - 1) & ((line_values == 0).sum(axis=1) == 1)
+        ]
+        result = np.zeros(self.COLUMNS * self.ROWS, dtype=bool)
+        result[threats.ravel()] = True
+        result &= flat_cells == 0
+        return result.reshape(self.COLUMNS, self.ROWS)
+
+
+@functools.lru_cache(maxsize=None)
+def get_line_index(columns: int, rows: int, win_length: int) -> LineIndex:
+    """
+    The LineIndex of a geometry, built once per process and shared by every match and agent.
+    """
+    return LineIndex(columns, rows, win_length)
+
+
+
+
+
+
 class ConnectXMatch:
     """
     This class represents a single Connect X game match.
+
+    The position is stored as one integer bitboard per player plus a mask of the occupied cells.
+    Each column uses ROWS + 1 bits: the extra sentinel bit is always empty, so shifting a
+    bitboard never carries a line from the top of one column into the bottom of the next.
+    The string board handed to agents is only materialised when `board` is read.
     """
     def __init__(
         self, 
@@ -48,7 +235,8 @@ class ConnectXMatch:
         rows: int, 
         win_length: int,
         first_player_name: str,
-        second_player_name: str
+        second_player_name: str,
+        enable_log: bool = True
     ):
         self.COLUMNS: int = columns
         self.ROWS: int = rows
@@ -56,12 +244,298 @@ class ConnectXMatch:
         self.FIRST_PLAYER_NAME: str = first_player_name
         self.SECOND_PLAYER_NAME: str = second_player_name
 
-        self.board: np.ndarray = np.full((columns, rows), None)
         self.game_state: GameState = GameState.IN_PROGRESS
         self.winner: str = None
         self.previous_player_who_played: str = None
         self.moves_played: Tuple[str, int] = []
-        self.log: List[str] = []
+        # The log is kept as (player index, column, outcome) records and rendered to text by the log property
+        self.enable_log: bool = enable_log
+        self._log_records: List[Tuple[int, int, GameState]] = []
+        # Reason given for an illegal move or an agent error
+        self.termination_message: str = None
+        # (player, wall time, CPU time) of every agent move, in seconds, recorded by ConnectXMatchWithAgents.
+        # The CPU time is None when it could not be measured, for an agent that overran the time limit in a thread.
+        self.move_timings: List[Tuple[str, float, float]] = []
+
+        # Bitboard engine
+        self._column_bits: int = rows + 1
+        self._column_mask: int = (1 << rows) - 1
+        self._bitboards: List[int] = [0, 0]
+        self._mask: int = 0
+        # Compact cell codes: 0 for empty, 1 for the first player and 2 for the second player
+        self._cells: np.ndarray = np.zeros((columns, rows), dtype=np.int8)
+        # Number of pieces in each column and on the whole board
+        self.column_heights: List[int] = [0] * columns
+        self.move_count: int = 0
+        # Zobrist hash of the position, updated on every move and undo
+        self._zobrist_table: Tuple[List[int], List[int]] = get_zobrist_table(columns, rows)
+        self._hash: int = 0
+        # Zobrist hash of the left-right mirror image of the position
+        self._mirror_hash: int = 0
+        # Winning lines of the geometry, shared with every match of the same geometry
+        self._line_index: LineIndex = get_line_index(columns, rows, win_length)
+        # Snapshots taken by push() and restored by pop()
+        self._undo_stack: List[Tuple] = []
+        # String board, materialised on demand by the board property
+        self._board: np.ndarray = None
+        # Signed cell values from the point of view of each player, allocated by the first
+        # get_observation call and then kept in sync move by move like the string board
+        self._signed_cells: np.ndarray = None
+
+    @classmethod
+    def from_board(cls, board: np.ndarray, win_length: int, player: str, opponent_name: str) -> "ConnectXMatch":
+        """
+        Build the match an agent is playing from the board it received, with the agent to move.
+        The first player is deduced from the number of pieces of each player, and the match does not keep a reference to the board.
+
+        Args:
+            board (np.ndarray): The board given to the agent.
+            win_length (int): The number of pieces in a row needed to win.
+            player (str): The name of the agent.
+            opponent_name (str): The name of the opponent.
+
+        Returns:
+            ConnectXMatch: The match, in a terminal state if the board is already won or full.
+        """
+        match = cls(board.shape[0], board.shape[1], win_length, player, opponent_name)
+        match._load_board(board)
+        if bin(match._bitboards[1]).count("1") > bin(match._bitboards[0]).count("1"):
+            match = cls(board.shape[0], board.shape[1], win_length, opponent_name, player)
+            match._load_board(board)
+        match._board = None
+        match._detect_outcome(opponent_name)
+        return match
+
+    @classmethod
+    def from_observation(cls, observation: "NumericObservation", win_length: int, player: str, opponent_name: str) -> "ConnectXMatch":
+        """
+        Build the match an agent is playing from the NumericObservation it received, with the agent to move, see from_board.
+        """
+        board = np.asarray(observation.board)
+        if np.count_nonzero(board == -1) > np.count_nonzero(board == 1):
+            match = cls(board.shape[0], board.shape[1], win_length, opponent_name, player)
+            cells = np.where(board == -1, 1, np.where(board == 1, 2, 0)).astype(np.int8)
+        else:
+            match = cls(board.shape[0], board.shape[1], win_length, player, opponent_name)
+            cells = np.where(board == 1, 1, np.where(board == -1, 2, 0)).astype(np.int8)
+        match._load_cells(cells)
+        match._detect_outcome(opponent_name)
+        return match
+
+    def _detect_outcome(self, last_player: str) -> None:
+        """ Set the state of a match loaded from a board, whose last move was played by last_player. """
+        if self.move_count > 0:
+            self.previous_player_who_played = last_player
+        for player_index, name in enumerate((self.FIRST_PLAYER_NAME, self.SECOND_PLAYER_NAME)):
+            if self._is_winning_bitboard(self._bitboards[player_index]):
+                self.game_state = GameState.WIN
+                self.winner = name
+        if self.game_state == GameState.IN_PROGRESS and self.check_draw():
+            self.game_state = GameState.DRAW
+
+    @property
+    def board(self) -> np.ndarray:
+        """
+        The board as a (COLUMNS, ROWS) array holding the player names, None for empty cells.
+        It is built from the cell codes the first time it is read and then kept in sync move by move.
+        """
+        if self._board is None:
+            self._board = self.get_board_copy()
+        return self._board
+
+    @board.setter
+    def board(self, board: np.ndarray) -> None:
+        self._load_board(board)
+
+    @property
+    def log(self) -> List[str]:
+        """
+        The human-readable log of the game, rendered from the log records on every read.
+        """
+        lines = []
+        for player_index, column, outcome in self._log_records:
+            player = self.FIRST_PLAYER_NAME if player_index == 0 else self.SECOND_PLAYER_NAME
+            if outcome == GameState.IN_PROGRESS:
+                lines.append(f"Player {player} played in column {column}.")
+            elif outcome == GameState.WIN:
+                lines.append(f"Player {player} won the game.")
+            elif outcome == GameState.DRAW:
+                lines.append("The game is a draw. All columns are full.")
+            elif outcome == GameState.ILLEGAL_MOVE:
+                lines.append(self.termination_message)
+                lines.append(f"Player {player} tried to play in full column {column} and lost.")
+            elif outcome == GameState.AGENT_ERROR:
+                lines.append(f"Player {player} caused an error and lost: {self.termination_message}")
+            elif outcome == GameState.TIME_LIMIT_EXCEEDED:
+                lines.append(f"Player {player} exceeded the time limit and lost.")
+        return lines
+
+    def _add_log_record(self, player: str, column: int, outcome: GameState) -> None:
+        if self.enable_log:
+            self._log_records.append((self._player_index(player), column, outcome))
+
+    @property
+    def line_index(self) -> LineIndex:
+        """ The shared LineIndex of the geometry of the match. """
+        if self._line_index.WIN_LENGTH != self.WIN_LENGTH:
+            self._line_index = get_line_index(self.COLUMNS, self.ROWS, self.WIN_LENGTH)
+        return self._line_index
+
+    @property
+    def zobrist_hash(self) -> int:
+        """
+        64-bit Zobrist hash of the pieces on the board.
+        The player to move is not part of the hash, it follows from the number of pieces in alternating play.
+        """
+        return self._hash
+
+    def canonical_key(self) -> Tuple[int, bool]:
+        """
+        Key shared by the position and its left-right mirror image: the smaller of their Zobrist hashes.
+        When the key is flipped, moves map between the position and the canonical frame with mirror_move.
+
+        Returns:
+            Tuple[int, bool]: The canonical key and whether it is the hash of the mirror image.
+        """
+        if self._mirror_hash < self._hash:
+            return self._mirror_hash, True
+        return self._hash, False
+
+    def mirror_move(self, column: int) -> int:
+        """ The column of a move in the left-right mirror image of the board. """
+        return self.COLUMNS - 1 - column
+
+    def get_board_copy(self) -> np.ndarray:
+        """
+        Build a new string board from the cell codes, independent of the match.
+        """
+        return np.array([None, self.FIRST_PLAYER_NAME, self.SECOND_PLAYER_NAME], dtype=object)[self._cells]
+
+    def _load_board(self, board: np.ndarray) -> None:
+        """
+        Rebuild the engine state from a string board.
+        A name that is neither of the two players is attributed to the player whose name is absent
+        from the board, which lets agents rebuild a match without knowing their own name.
+        """
+        names = [self.FIRST_PLAYER_NAME, self.SECOND_PLAYER_NAME]
+        board_names = set(board[board != None])
+        unknown_names = board_names - set(names)
+        if unknown_names:
+            absent_names = [name for name in names if name not in board_names]
+            if len(unknown_names) > 1 or len(absent_names) != 1:
+                raise Exception(f"Error, cannot match the board values {unknown_names} to players {names}.")
+            names[names.index(absent_names[0])] = unknown_names.pop()
+
+        cells = np.zeros((self.COLUMNS, self.ROWS), dtype=np.int8)
+        cells[board == names[0]] = 1
+        cells[board == names[1]] = 2
+        self._load_cells(cells)
+        self._board = board
+
+    def _load_cells(self, cells: np.ndarray) -> None:
+        """ Rebuild the engine state from (COLUMNS, ROWS) cell codes, which the match takes ownership of. """
+        bitboards = [0, 0]
+        zobrist_hash = 0
+        mirror_hash = 0
+        for column, row in zip(*np.nonzero(cells)):
+            player_index = cells[column, row] - 1
+            position = int(column) * self._column_bits + int(row)
+            bitboards[player_index] |= 1 << position
+            zobrist_hash ^= self._zobrist_table[player_index][position]
+            mirror_hash ^= self._zobrist_table[player_index][(self.COLUMNS - 1 - int(column)) * self._column_bits + int(row)]
+        self._hash = zobrist_hash
+        self._mirror_hash = mirror_hash
+        self._cells = cells
+        self._bitboards = bitboards
+        self._mask = bitboards[0] | bitboards[1]
+        self.column_heights = [
+            ((self._mask >> (column * self._column_bits)) & self._column_mask).bit_length() for column in range(self.COLUMNS)
+        ]
+        self.move_count = int(np.count_nonzero(cells))
+        self._board = None
+        if self._signed_cells is not None:
+            # Refilled in place, so that observations already handed out stay views of the match
+            self._fill_signed_cells()
+
+    def _fill_signed_cells(self) -> None:
+        self._signed_cells[0] = (self._cells == 1).astype(np.int8) - (self._cells == 2)
+        np.negative(self._signed_cells[0], out=self._signed_cells[1])
+
+    def get_observation(self, player: str) -> NumericObservation:
+        """
+        The NumericObservation of the position for a player, without copying the board.
+        The first call allocates the signed buffers, which every later move then updates in place.
+        """
+        if self._signed_cells is None:
+            self._signed_cells = np.empty((2, self.COLUMNS, self.ROWS), dtype=np.int8)
+            self._fill_signed_cells()
+        board = self._signed_cells[self._player_index(player)].view()
+        board.flags.writeable = False
+        heights = np.array(self.column_heights, dtype=np.int32)
+        return NumericObservation(board, heights, heights < self.ROWS)
+
+    def _player_index(self, player: str) -> int:
+        return 0 if player == self.FIRST_PLAYER_NAME else 1
+
+    def _place_piece(self, column: int, player_index: int) -> int:
+        """ Drop a piece in the column and return the row it landed on. """
+        row = self.column_heights[column]
+        position = column * self._column_bits + row
+        bit = 1 << position
+        self.column_heights[column] += 1
+        self.move_count += 1
+        self._hash ^= self._zobrist_table[player_index][position]
+        self._mirror_hash ^= self._zobrist_table[player_index][(self.COLUMNS - 1 - column) * self._column_bits + row]
+        self._bitboards[player_index] |= bit
+        self._mask |= bit
+        self._cells[column, row] = player_index + 1
+        if self._board is not None:
+            self._board[column][row] = self.FIRST_PLAYER_NAME if player_index == 0 else self.SECOND_PLAYER_NAME
+        if self._signed_cells is not None:
+            self._signed_cells[player_index, column, row] = 1
+            self._signed_cells[1 - player_index, column, row] = -1
+        return row
+
+    def _remove_piece(self, column: int, player_index: int) -> None:
+        """ Remove the top piece of the column. """
+        self.column_heights[column] -= 1
+        self.move_count -= 1
+        row = self.column_heights[column]
+        position = column * self._column_bits + row
+        bit = 1 << position
+        self._hash ^= self._zobrist_table[player_index][position]
+        self._mirror_hash ^= self._zobrist_table[player_index][(self.COLUMNS - 1 - column) * self._column_bits + row]
+        self._bitboards[player_index] ^= bit
+        self._mask ^= bit
+        self._cells[column, row] = 0
+        if self._board is not None:
+            self._board[column][row] = None
+        if self._signed_cells is not None:
+            self._signed_cells[:, column, row] = 0
+
+    def _is_winning_bitboard(self, bitboard: int) -> bool:
+        """
+        Shift-and-AND win detection: after k rounds, a bit survives only if it starts a run of k + 1 pieces.
+        The shifts are vertical, horizontal and the two diagonals.
+        """
+        for shift in (1, self._column_bits, self._column_bits + 1, self._column_bits - 1):
+            runs = bitboard
+            for _ in range(self.WIN_LENGTH - 1):
+                runs &= runs >> shift
+                if not runs:
+                    break
+            if runs:
+                return True
+        return False
+
+    def _is_winning_move(self, bitboard: int, column: int, row: int) -> bool:
+        """
+        Check only the lines through the piece at (column, row), with one mask test per line.
+        """
+        for line in self.line_index.position_bitmasks[column * self._column_bits + row]:
+            if bitboard & line == line:
+                return True
+        return False
 
     def get_other_player(self, player: str) -> str:
         if player == self.FIRST_PLAYER_NAME:
@@ -84,11 +558,27 @@ class ConnectXMatch:
         self.game_state = GameState.AGENT_ERROR
         self.winner = self.get_other_player(player)
         self.previous_player_who_played = player
+        self.termination_message = error_message
         
         # Add log messages
-        message = f"Player {player} caused an error and lost: {error_message}"
-        self.log.append(message)
-        print(message)
+        self._add_log_record(player, None, GameState.AGENT_ERROR)
+        print(f"Player {player} caused an error and lost: {error_message}")
+
+    def register_time_limit_exceeded(self, player: str) -> None:
+        """
+        Register that an agent exceeded the time limit. The player automatically loses the game.
+
+        Args:
+            player (str): The player who exceeded the time limit.
+
+        Returns:
+            None
+        """
+        self.game_state = GameState.TIME_LIMIT_EXCEEDED
+        self.winner = self.get_other_player(player)
+        self.previous_player_who_played = player
+        self._add_log_record(player, None, GameState.TIME_LIMIT_EXCEEDED)
+        print(f"Player {player} exceeded the time limit and lost.")
 
     def check_illegal_move(self, column: int, player: str) -> Tuple[GameState, str]:
         # Check if player exists
@@ -106,16 +596,15 @@ class ConnectXMatch:
         if column < 0 or column >= self.COLUMNS:
             return GameState.ILLEGAL_MOVE, "Played outside of the board."
         # Check if the column is already full before move.
-        for row in range(0, self.ROWS):
-            if self.board[column][row] is None:
-                return GameState.IN_PROGRESS, ""
-        return GameState.ILLEGAL_MOVE, "Tried to play in a full column"
+        if self.column_heights[int(column)] >= self.ROWS:
+            return GameState.ILLEGAL_MOVE, "Tried to play in a full column"
+        return GameState.IN_PROGRESS, ""
     
     def check_win(self) -> bool:
-        for x, y in itertools.product(range(self.COLUMNS), range(self.ROWS)):
-            if self.check_win_at_position(x, y):
-                return True
-        return False
+        # The board may have been edited directly, so re-read it when it has been materialised.
+        if self._board is not None:
+            self._load_board(self._board)
+        return any(self._is_winning_bitboard(bitboard) for bitboard in self._bitboards)
     
     def check_win_at_position(self, x, y) -> bool:
         # Make a subarray with lower left corner at x, y
@@ -151,9 +640,7 @@ class ConnectXMatch:
         return False
     
     def check_draw(self) -> bool:
-        if all(all(self.board[col][row] is not None for row in range(self.ROWS)) for col in range(self.COLUMNS)):
-            return True
-        return False
+        return self.move_count == self.COLUMNS * self.ROWS
     
     def make_move(self, column: int, player: str) -> bool:
         """ This method:
@@ -183,36 +670,95 @@ class ConnectXMatch:
             self.game_state = state
             self.winner = self.get_other_player(player)
             self.previous_player_who_played = player
-            self.log.append(message)
-            self.log.append(f"Player {player} tried to play in full column {column} and lost.")
+            self.termination_message = message
+            self._add_log_record(player, column, GameState.ILLEGAL_MOVE)
             print(message)
             return False
         # Make sure to convert the column to an integer
         # At this point, we know the column is valid, but it may be a string, or another castable type.
         column = int(column)
+        self.moves_played[-1] = (player, column)
         # Make the actual move - modify the game board
-        for row in range(0, self.ROWS):
-            if self.board[column][row] is None:
-                self.board[column][row] = player
-                break
+        player_index = self._player_index(player)
+        row = self._place_piece(column, player_index)
         # UPDATE STATE FOR WIN
-        if self.check_win():
+        if self._is_winning_move(self._bitboards[player_index], column, row):
             self.game_state = GameState.WIN
             self.winner = player
             self.previous_player_who_played = player
-            self.log.append(f"Player {player} won the game.")
+            self._add_log_record(player, column, GameState.WIN)
             return False
         # UPDATE STATE FOR DRAW
         if self.check_draw():
             self.game_state = GameState.DRAW
             self.previous_player_who_played = player
-            self.log.append("The game is a draw. All columns are full.")
+            self._add_log_record(player, column, GameState.DRAW)
             return False
         # UPDATE STATE FOR IN PROGRESS
-        self.log.append(f"Player {player} played in column {column}.")
+        self._add_log_record(player, column, GameState.IN_PROGRESS)
         self.previous_player_who_played = player
         return True
 
+    def push(self, column: int, player: str = None) -> bool:
+        """
+        Play a move in place and remember how to undo it with pop().
+        Pushes and pops nest, so a search can walk a single mutable match.
+
+        Args:
+            column (int): The column in which to play the move.
+            player (str): The player making the move. Defaults to the next player.
+
+        Returns:
+            bool: True if the game goes on, False otherwise.
+        """
+        self._undo_stack.append((
+            self.game_state,
+            self.winner,
+            self.previous_player_who_played,
+            self.move_count,
+            len(self.moves_played),
+            len(self._log_records),
+            self.termination_message
+        ))
+        try:
+            if player is None:
+                return self.play_with_next_player(column)
+            return self.make_move(column, player)
+        except Exception:
+            self.pop()
+            raise
+
+    def pop(self) -> None:
+        """
+        Undo the last push(), restoring the board, heights, winner and game state exactly.
+        """
+        game_state, winner, previous_player_who_played, move_count, moves_length, log_length, termination_message = self._undo_stack.pop()
+        if self.move_count != move_count:
+            player, column = self.moves_played[moves_length]
+            self._remove_piece(int(column), self._player_index(player))
+        self.game_state = game_state
+        self.winner = winner
+        self.previous_player_who_played = previous_player_who_played
+        self.termination_message = termination_message
+        del self.moves_played[moves_length:]
+        del self._log_records[log_length:]
+
+    @contextlib.contextmanager
+    def try_move(self, column: int, player: str = None):
+        """
+        Context manager form of push() and pop(): the move is undone when the block exits.
+
+        Example:
+            with match.try_move(3):
+                if match.game_state == GameState.WIN:
+                    ...
+        """
+        self.push(column, player)
+        try:
+            yield self
+        finally:
+            self.pop()
+
     def play_with_next_player(self, column: int) -> GameState:
         """ Automatically figures out the next player to play based on the last player to have played.
         """
@@ -247,7 +793,8 @@ class ConnectXMatch:
             self.WIN_LENGTH == other.WIN_LENGTH and
             self.FIRST_PLAYER_NAME == other.FIRST_PLAYER_NAME and
             self.SECOND_PLAYER_NAME == other.SECOND_PLAYER_NAME and
-            np.array_equal(self.board, other.board) and
+            self._hash == other._hash and
+            self._bitboards == other._bitboards and
             self.game_state == other.game_state and
             self.winner == other.winner and
             self.previous_player_who_played == other.previous_player_who_played
@@ -255,40 +802,58 @@ class ConnectXMatch:
             # self.log == other.log
         )
 
-    def copy(self):
-        return copy.deepcopy(self)
+    def copy(self, enable_log: bool = None):
+        """
+        Copy the match. The cell codes are copied in one go and the string board is rebuilt on demand.
+
+        Args:
+            enable_log (bool): Whether the copy keeps a log. Defaults to the setting of this match.
+                A copy without a log, as used for search and simulation, starts with an empty log.
+        """
+        new_instance: ConnectXMatch = self.__class__.__new__(self.__class__)
+        new_instance.__dict__.update(self.__dict__)
+        new_instance._bitboards = list(self._bitboards)
+        new_instance._cells = self._cells.copy()
+        new_instance.column_heights = list(self.column_heights)
+        new_instance._undo_stack = list(self._undo_stack)
+        new_instance._board = None
+        new_instance._signed_cells = None
+        new_instance.moves_played = list(self.moves_played)
+        new_instance.move_timings = list(self.move_timings)
+        if enable_log is not None:
+            new_instance.enable_log = enable_log
+        new_instance._log_records = list(self._log_records) if new_instance.enable_log else []
+        return new_instance
     
     def deepcopy(self):
-        new_instance = ConnectXMatch(
-            self.COLUMNS,
-            self.ROWS,
-            self.WIN_LENGTH,
-            self.FIRST_PLAYER_NAME,
-            self.SECOND_PLAYER_NAME
-        )
-        new_instance.board = copy.deepcopy(self.board)
-        new_instance.game_state = self.game_state
-        new_instance.winner = self.winner
-        new_instance.previous_player_who_played = self.previous_player_who_played
-        new_instance.moves_played = copy.deepcopy(self.moves_played)
-        new_instance.log = copy.deepcopy(self.log)
-        return new_instance
+        return self.copy()
     
     def __deepcopy__(self, memo):
         return self.deepcopy()
 
+    def __hash__(self):
+        return self._hash
+
+    def __getstate__(self):
+        # The string board and the Zobrist table are derived data, so they are not pickled.
+        state = self.__dict__.copy()
+        state["_board"] = None
+        state["_signed_cells"] = None
+        del state["_zobrist_table"]
+        del state["_line_index"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._zobrist_table = get_zobrist_table(self.COLUMNS, self.ROWS)
+        self._line_index = get_line_index(self.COLUMNS, self.ROWS, self.WIN_LENGTH)
+
     def getPossibleActions(self) -> List[int]:
-        legal_actions = []
-        for column in range(self.COLUMNS):
-            if not all(self.board[column] != None):
-                legal_actions.append(column)
-        return legal_actions
+        return [column for column in range(self.COLUMNS) if self.column_heights[column] < self.ROWS]
     
     def takeAction(self, action: int):
-        new_match: ConnectXMatch = self.deepcopy()
-        if self.previous_player_who_played is None:
-            new_match.make_move(action, self.FIRST_PLAYER_NAME)
-        new_match.make_move(action, self.get_other_player(self.previous_player_who_played))
+        new_match: ConnectXMatch = self.copy(enable_log=False)
+        new_match.play_with_next_player(action)
         return new_match
     
     def isTerminal(self) -> bool:
@@ -302,11 +867,217 @@ class ConnectXMatch:
         else:
             raise Exception("Game is not in terminal state. Cannot get reward.")
 
+    def rollout(self, policy: str = "random", rng: random.Random = random) -> int:
+        """
+        Play the position out to the end inside the engine, without creating match objects
+        and without modifying this match.
+
+        Args:
+            policy (str): "random" plays uniformly random legal moves,
+                "winning" plays an immediate win when there is one and a random move otherwise.
+            rng (random.Random): Source of randomness. Defaults to the global random module.
+
+        Returns:
+            int: The reward of the finished game as in getReward: 1 if the first player wins, -1 if the second player wins, 0 for a draw.
+        """
+        if policy not in ("random", "winning"):
+            raise Exception(f"Error, unknown rollout policy {policy}.")
+        if self.game_state != GameState.IN_PROGRESS:
+            if self.game_state == GameState.DRAW:
+                return 0
+            return 1 if self.winner == self.FIRST_PLAYER_NAME else -1
+
+        column_bits = self._column_bits
+        bitboards = list(self._bitboards)
+        heights = list(self.column_heights)
+        legal_columns = [column for column in range(self.COLUMNS) if heights[column] < self.ROWS]
+        player_index = 0 if self.previous_player_who_played is None else 1 - self._player_index(self.previous_player_who_played)
+        while legal_columns:
+            column = None
+            if policy == "winning":
+                for candidate in legal_columns:
+                    if self._is_winning_move(bitboards[player_index] | (1 << (candidate * column_bits + heights[candidate])), candidate, heights[candidate]):
+                        column = candidate
+                        break
+            if column is None:
+                column = rng.choice(legal_columns)
+            row = heights[column]
+            heights[column] += 1
+            if heights[column] == self.ROWS:
+                legal_columns.remove(column)
+            bitboards[player_index] |= 1 << (column * column_bits + row)
+            if self._is_winning_move(bitboards[player_index], column, row):
+                return 1 if player_index == 0 else -1
+            player_index = 1 - player_index
+        return 0
+
+    def rollouts(self, number_of_rollouts: int, policy: str = "random", rng: random.Random = random, player: str = None) -> Tuple[int, int, int]:
+        """
+        Play several rollouts from the position.
+
+        Args:
+            number_of_rollouts (int): Number of rollouts to play.
+            policy (str): Rollout policy, see rollout().
+            rng (random.Random): Source of randomness. Defaults to the global random module.
+            player (str): Player whose results are counted. Defaults to the player to move.
+
+        Returns:
+            Tuple[int, int, int]: The number of wins, draws and losses for the player.
+        """
+        if player is None:
+            player = self.FIRST_PLAYER_NAME if self.previous_player_who_played is None else self.get_other_player(self.previous_player_who_played)
+        sign = 1 if player == self.FIRST_PLAYER_NAME else -1
+        wins, draws, losses = 0, 0, 0
+        for _ in range(number_of_rollouts):
+            reward = self.rollout(policy, rng) * sign
+            if reward > 0:
+                wins += 1
+            elif reward < 0:
+                losses += 1
+            else:
+                draws += 1
+        return wins, draws, losses
+
+
+
+
+
+
+class BatchConnectX:
+    """
+    This class steps many Connect X games at once with array operations.
+    The boards use the same cell codes as ConnectXMatch: 0 for empty, 1 for the first player and 2 for the second player.
+    """
+    def __init__(
+        self,
+        number_of_games: int,
+        columns: int,
+        rows: int,
+        win_length: int
+    ):
+        self.NUMBER_OF_GAMES: int = number_of_games
+        self.COLUMNS: int = columns
+        self.ROWS: int = rows
+        self.WIN_LENGTH: int = win_length
+
+        self.boards: np.ndarray = np.zeros((number_of_games, columns, rows), dtype=np.int8)
+        self.heights: np.ndarray = np.zeros((number_of_games, columns), dtype=np.int32)
+        self.move_counts: np.ndarray = np.zeros(number_of_games, dtype=np.int32)
+        # Code of the player to move in each game
+        self.players: np.ndarray = np.ones(number_of_games, dtype=np.int8)
+        # Code of the winner of each game, 0 while in progress or for a draw
+        self.winners: np.ndarray = np.zeros(number_of_games, dtype=np.int8)
+        self.done: np.ndarray = np.zeros(number_of_games, dtype=bool)
+        self.line_index: LineIndex = get_line_index(columns, rows, win_length)
+
+    def reset(self, games: np.ndarray = None) -> None:
+        """
+        Reset the selected games (a boolean mask or indices) to an empty board, or all of them.
+        """
+        if games is None:
+            games = slice(None)
+        self.boards[games] = 0
+        self.heights[games] = 0
+        self.move_counts[games] = 0
+        self.players[games] = 1
+        self.winners[games] = 0
+        self.done[games] = False
+
+    def legal_moves_mask(self) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: (NUMBER_OF_GAMES, COLUMNS) booleans, all False for finished games.
+        """
+        return (self.heights < self.ROWS) & ~self.done[:, None]
+
+    def random_legal_moves(self, rng: np.random.Generator = None) -> np.ndarray:
+        """
+        Pick a uniformly random legal column for every game. Finished games get column 0, which step() ignores.
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        scores = rng.random((self.NUMBER_OF_GAMES, self.COLUMNS))
+        return np.where(self.legal_moves_mask(), scores, -1.0).argmax(axis=1)
+
+    def step(self, columns: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Play one move in every game that is still in progress. Finished games ignore their column.
+        An illegal move ends the game and the other player wins, as in ConnectXMatch.
+
+        Args:
+            columns (np.ndarray): One column per game.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: Boolean vectors of legal moves, wins,
+            draws and finished games after the move.
+        """
+        columns = np.asarray(columns).astype(np.int64)
+        active = ~self.done
+        inside = (columns >= 0) & (columns < self.COLUMNS)
+        clipped_columns = np.where(inside, columns, 0)
+        games = np.arange(self.NUMBER_OF_GAMES)
+        rows = self.heights[games, clipped_columns]
+        legal = active & inside & (rows < self.ROWS)
+        illegal = active & ~legal
+
+        # Drop the pieces
+        played = np.nonzero(legal)[0]
+        played_columns = clipped_columns[played]
+        played_rows = rows[played]
+        played_players = self.players[played]
+        self.boards[played, played_columns, played_rows] = played_players
+        self.heights[played, played_columns] += 1
+        self.move_counts[played] += 1
+
+        # Look up the lines through the new pieces, (played, lines through a cell, WIN_LENGTH) cell numbers
+        win = np.zeros(self.NUMBER_OF_GAMES, dtype=bool)
+        line_numbers = self.line_index.cell_lines_table[played_columns * self.ROWS + played_rows]
+        line_cells = self.line_index.line_cells[np.maximum(line_numbers, 0)]
+        flat_boards = self.boards.reshape(self.NUMBER_OF_GAMES, -1)
+        complete_lines = (flat_boards[played[:, None, None], line_cells] == played_players[:, None, None]).all(axis=2)
+        win[played] = (complete_lines & (line_numbers >= 0)).any(axis=1)
+        draw = legal & ~win & (self.move_counts == self.COLUMNS * self.ROWS)
+
+        # Update the game states
+        self.winners[win] = self.players[win]
+        self.winners[illegal] = 3 - self.players[illegal]
+        self.done |= illegal | win | draw
+        continuing = legal & ~self.done
+        self.players[continuing] = 3 - self.players[continuing]
+        return legal, win, draw, self.done.copy()
+
+    def play_random_games(self, rng: np.random.Generator = None) -> np.ndarray:
+        """
+        Play random legal moves in every game until all of them are finished.
 
+        Returns:
+            np.ndarray: The winner code of each game, 0 for a draw.
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        while not self.done.all():
+            self.step(self.random_legal_moves(rng))
+        return self.winners.copy()
 
 
 
 
+
+
+def derive_seed(seed: int, *keys: int) -> int:
+    """
+    A 32-bit seed derived from a master seed and a path of integer keys, such as a matchup and a game index.
+    Seeds of different paths are statistically independent, and the same path always gives the same seed.
+    """
+    return int(np.random.SeedSequence(seed, spawn_key=keys).generate_state(1)[0])
+
+
+def seed_game(seed: int) -> None:
+    """ Seed the global random and np.random generators, which agents draw from. """
+    random.seed(seed)
+    np.random.seed(seed)
+
+
 class ConnectXMatchWithAgents:
     def __init__(
         self,
@@ -318,7 +1089,9 @@ class ConnectXMatchWithAgents:
         first_player_func: Callable,
         second_player_func: Callable,
         time_limit: int,
-        enable_thread_protection: bool = True
+        enable_thread_protection: bool = True,
+        enable_process_isolation: bool = False,
+        seed: int = None
     ):
         self.game: ConnectXMatch = ConnectXMatch(columns, rows, win_length, first_player_name, second_player_name)
         self.first_player_name = first_player_name
@@ -327,12 +1100,51 @@ class ConnectXMatchWithAgents:
         self.second_player_func: Callable = second_player_func
         self.time_limit: float = time_limit
         self.enable_thread_protection: bool = enable_thread_protection
+        # Run each agent in its own warm process, see agent_process. This replaces thread protection, and the time limit
+        # applies to the CPU time of the move, with a separate wall-clock limit of agent_process.WALL_TIME_FACTOR times the time limit
+        self.enable_process_isolation: bool = enable_process_isolation
+        # Seed of random and np.random for the game, installed by play_full_game, in the agent processes with process isolation
+        self.seed: int = seed
+
+    def _install_seed(self) -> None:
+        if not self.enable_process_isolation:
+            seed_game(self.seed)
+            return
+        for player, func in [(self.first_player_name, self.first_player_func), (self.second_player_name, self.second_player_func)]:
+            try:
+                get_agent_process(player, func).seed(self.seed)
+            except Exception as e:
+                # The agent process fails again on its first move, which reports the error
+                print(f"Error when seeding {player}: {e}")
+
+    def _get_agent_board(self, player: str, func: Callable):
+        """
+        What the agent function of the player receives: a NumericObservation if it is marked with
+        numeric_observation, otherwise a copy of the string board.
+        """
+        if wants_numeric_observation(func):
+            return self.game.get_observation(player)
+        return self.game.get_board_copy()
+
+    def _call_agent_in_process(self, player: str, func: Callable) -> Tuple[str, object, float]:
+        """
+        Ask the agent process of the player for a move, see AgentProcess.play.
+        The CPU time of the move, measured in the agent process, is returned last, None if it is unknown.
+        """
+        try:
+            agent_process: AgentProcess = get_agent_process(player, func)
+        except Exception as e:
+            return AgentProcess.ERROR, str(e), None
+        board_copy = self._get_agent_board(player, func)
+        status, result = agent_process.play(board_copy, self.game.WIN_LENGTH, self.game.get_other_player(player), self.time_limit)
+        return status, result, agent_process.last_cpu_time if status != AgentProcess.ERROR else None
 
     def play_move_with_agent(self, player: str) -> bool:
         """
         This method plays a move with the agent specified by the player argument.
-        This method creates a new thread to enforce the time limit when enable_thread_protection is True.
-        Otherwise, it calls the agent function directly.
+        With enable_process_isolation, the agent runs in its own process, which is killed if it overruns the time limit.
+        Otherwise, this method creates a new thread to enforce the time limit when enable_thread_protection is True,
+        or calls the agent function directly.
 
         Args:
             player (str): The player who is making the move.
@@ -342,26 +1154,42 @@ class ConnectXMatchWithAgents:
         """
         # Get the appropriate function for the player
         func: Callable = self.first_player_func if player == self.game.FIRST_PLAYER_NAME else self.second_player_func
-        
-        if self.enable_thread_protection:
+
+        if self.enable_process_isolation:
+            start = time.perf_counter()
+            status, result, cpu_time = self._call_agent_in_process(player, func)
+            self.game.move_timings.append((player, time.perf_counter() - start, cpu_time))
+            if status == AgentProcess.ERROR:
+                self.game.register_agent_error(player, result)
+                return False
+            if status == AgentProcess.TIMEOUT:
+                self.game.register_time_limit_exceeded(player)
+                return GameState.TIME_LIMIT_EXCEEDED
+            return self.game.make_move(result, player)
+        elif self.enable_thread_protection:
             # Create a nested function to run the agent function
             column_answer = None
             agent_error = None
+            cpu_time = None
             
             def agent_move():
-                nonlocal column_answer, agent_error
+                nonlocal column_answer, agent_error, cpu_time
+                cpu_start = time.thread_time()
                 try:
-                    board_copy: np.ndarray = copy.deepcopy(self.game.board)
+                    board_copy = self._get_agent_board(player, func)
                     opponent_name = self.game.get_other_player(player)
                     column_answer = func(board_copy, self.game.WIN_LENGTH, opponent_name)
                 except Exception as e:
                     agent_error = str(e)
+                cpu_time = time.thread_time() - cpu_start
 
             # Call the function in a thread
+            start = time.perf_counter()
             move_thread = threading.Thread(target=agent_move)
             move_thread.start()
             # Start the thread and wait until the function returns or the time limit is exceeded.
             move_thread.join(timeout=self.time_limit)
+            self.game.move_timings.append((player, time.perf_counter() - start, None if move_thread.is_alive() else cpu_time))
             
             # Handle agent error if it occurred
             if agent_error is not None:
@@ -370,21 +1198,21 @@ class ConnectXMatchWithAgents:
                 
             # UPDATE STATE FOR TIME LIMIT EXCEEDED
             if move_thread.is_alive():
-                self.game.game_state = GameState.TIME_LIMIT_EXCEEDED
-                self.game.winner = self.game.get_other_player(player)
-                self.previous_player_who_played = player
-                message = f"Player {player} exceeded the time limit and lost."
-                self.game.log.append(message)
-                print(message)
+                self.game.register_time_limit_exceeded(player)
                 return GameState.TIME_LIMIT_EXCEEDED
             # If the thread finished on time, make the move
             return self.game.make_move(column_answer, player)
         else:
             # Call the agent function directly without thread protection
             try:
-                board_copy: np.ndarray = copy.deepcopy(self.game.board)
-                opponent_name = self.game.get_other_player(player)
-                column_answer = func(board_copy, self.game.WIN_LENGTH, opponent_name)
+                start = time.perf_counter()
+                cpu_start = time.thread_time()
+                try:
+                    board_copy = self._get_agent_board(player, func)
+                    opponent_name = self.game.get_other_player(player)
+                    column_answer = func(board_copy, self.game.WIN_LENGTH, opponent_name)
+                finally:
+                    self.game.move_timings.append((player, time.perf_counter() - start, time.thread_time() - cpu_start))
                 return self.game.make_move(column_answer, player)
             except Exception as e:
                 self.game.register_agent_error(player, str(e))
@@ -401,12 +1229,103 @@ class ConnectXMatchWithAgents:
         Returns:
             bool: True if the game goes on, False otherwise.
         """
-        # Determine the current player
+        return self.play_move_with_agent(self._get_next_player())
+
+    def _get_next_player(self) -> str:
         if self.game.previous_player_who_played is None:
-            next_player: str = self.game.FIRST_PLAYER_NAME
-        else:
-            next_player: str = self.game.get_other_player(self.game.previous_player_who_played)
-        return self.play_move_with_agent(next_player)
+            return self.game.FIRST_PLAYER_NAME
+        return self.game.get_other_player(self.game.previous_player_who_played)
+
+    def _start_agent_call(self, player: str, func: Callable, cpu_times: List[float]) -> asyncio.Future:
+        """
+        Start an agent call on the running event loop. Agent functions defined with async def are awaited on the loop,
+        other agent functions run in a new daemon thread, as with thread protection, and append their thread CPU time
+        to cpu_times before the future gets their answer. The move starts at once, so the time limit only counts its own time.
+        """
+        board_copy = self._get_agent_board(player, func)
+        opponent_name = self.game.get_other_player(player)
+        if asyncio.iscoroutinefunction(func):
+            return asyncio.ensure_future(func(board_copy, self.game.WIN_LENGTH, opponent_name))
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def answer(column_answer, agent_error: Exception) -> None:
+            # The future is cancelled if the move overran the time limit
+            if future.done():
+                return
+            if agent_error is not None:
+                future.set_exception(agent_error)
+            else:
+                future.set_result(column_answer)
+
+        def agent_move():
+            column_answer = None
+            agent_error = None
+            cpu_start = time.thread_time()
+            try:
+                column_answer = func(board_copy, self.game.WIN_LENGTH, opponent_name)
+            except Exception as e:
+                agent_error = e
+            cpu_times.append(time.thread_time() - cpu_start)
+            try:
+                loop.call_soon_threadsafe(answer, column_answer, agent_error)
+            except RuntimeError:
+                # The event loop was closed while a late move was running
+                pass
+
+        threading.Thread(target=agent_move, daemon=True).start()
+        return future
+
+    async def play_move_with_agent_async(self, player: str):
+        """
+        Asyncio counterpart of play_move_with_agent, to keep many games in flight on one event loop.
+        The move is awaited with asyncio.wait_for, and timeouts and errors end the game as with thread protection.
+        Like a protected thread, an agent function that is not a coroutine function runs in its own thread,
+        which cannot be stopped and is left to finish on its own if the move overruns the time limit.
+
+        Args:
+            player (str): The player who is making the move.
+
+        Returns:
+            bool: True if the game goes on, False otherwise.
+        """
+        if self.enable_process_isolation:
+            raise Exception("Error, process isolation is not supported by the asyncio runner.")
+        func: Callable = self.first_player_func if player == self.game.FIRST_PLAYER_NAME else self.second_player_func
+        cpu_times: List[float] = []
+        start = time.perf_counter()
+        try:
+            call = self._start_agent_call(player, func, cpu_times)
+            column_answer = await asyncio.wait_for(call, timeout=self.time_limit)
+        except asyncio.TimeoutError:
+            self.game.move_timings.append((player, time.perf_counter() - start, None))
+            self.game.register_time_limit_exceeded(player)
+            return GameState.TIME_LIMIT_EXCEEDED
+        except Exception as e:
+            self.game.move_timings.append((player, time.perf_counter() - start, cpu_times[0] if cpu_times else None))
+            self.game.register_agent_error(player, str(e))
+            return False
+        self.game.move_timings.append((player, time.perf_counter() - start, cpu_times[0] if cpu_times else None))
+        return self.game.make_move(column_answer, player)
+
+    async def play_full_game_async(self) -> str:
+        """
+        Asyncio counterpart of play_full_game, see play_move_with_agent_async.
+
+        Returns:
+            str: The name of the winning agent.
+        """
+        while self.game.game_state == GameState.IN_PROGRESS:
+            await self.play_move_with_agent_async(self._get_next_player())
+
+        # Inform both agents about the final state, without waiting longer than a move for either
+        for player, func in [(self.first_player_name, self.first_player_func), (self.second_player_name, self.second_player_func)]:
+            try:
+                await asyncio.wait_for(self._start_agent_call(player, func, []), timeout=self.time_limit)
+            except Exception as e:
+                print(f"Error when informing {player} about final state: {e!r}")
+        return self.game.winner
 
     def play_full_game(self) -> str:
         """
@@ -415,13 +1334,23 @@ class ConnectXMatchWithAgents:
         Returns:
             str: The name of the winning agent.
         """
+        if self.seed is not None:
+            self._install_seed()
         while self.game.game_state == GameState.IN_PROGRESS:
             self.play_move_with_next_agent()
         
         # After the game is over, inform both agents about the final state
+        if self.enable_process_isolation:
+            # The agents keep their state in their processes, so they are informed there
+            for player, func in [(self.first_player_name, self.first_player_func), (self.second_player_name, self.second_player_func)]:
+                status, result, _ = self._call_agent_in_process(player, func)
+                if status != AgentProcess.OK:
+                    print(f"Error when informing {player} about final state: {status} {result}")
+            return self.game.winner
+
         try:
             # Call first agent with final state
-            board_copy: np.ndarray = copy.deepcopy(self.game.board)
+            board_copy = self._get_agent_board(self.first_player_name, self.first_player_func)
             self.first_player_func(board_copy, self.game.WIN_LENGTH, self.second_player_name)
         except Exception as e:
             # Ignore any errors that might occur
@@ -429,7 +1358,7 @@ class ConnectXMatchWithAgents:
             
         try:
             # Call second agent with final state
-            board_copy: np.ndarray = copy.deepcopy(self.game.board)
+            board_copy = self._get_agent_board(self.second_player_name, self.second_player_func)
             self.second_player_func(board_copy, self.game.WIN_LENGTH, self.first_player_name)
         except Exception as e:
             # Ignore any errors that might occur
@@ -444,6 +1373,299 @@ class ConnectXMatchWithAgents:
 
 
 
+class GameRecord:
+    """
+    Compact record of a finished game, sent back by pool workers instead of the whole match.
+    The legal moves are kept as an array of the narrowest unsigned type that holds every column, one byte
+    on boards of up to 256 columns, and the match, with its board, move list and log, is rebuilt by replaying
+    them with to_match. An illegal last move is kept as it was played.
+
+    Args:
+        columns (int): Number of columns.
+        rows (int): Number of rows.
+        win_length (int): Number of pieces in a row needed to win.
+        first_player_name (str): The player who started.
+        second_player_name (str): The other player.
+        moves (array): The columns of the legal moves, in order.
+        game_state (GameState): How the game ended.
+        winner (str): The winner, None for a draw.
+        termination_message (str): The reason given for an illegal move or an agent error.
+        illegal_move (object): The move that ended the game, if it was illegal.
+        wall_times (array): Wall time of every agent move, in seconds.
+        cpu_times (array): CPU time of every agent move, in seconds, NaN when it is unknown.
+        game_index (int): Index of the game in its matchup, if it was played by one.
+    """
+    def __init__(
+        self,
+        columns: int,
+        rows: int,
+        win_length: int,
+        first_player_name: str,
+        second_player_name: str,
+        moves: array,
+        game_state: GameState,
+        winner: str,
+        termination_message: str = None,
+        illegal_move: object = None,
+        wall_times: array = None,
+        cpu_times: array = None,
+        game_index: int = None
+    ):
+        self.COLUMNS: int = columns
+        self.ROWS: int = rows
+        self.WIN_LENGTH: int = win_length
+        self.FIRST_PLAYER_NAME: str = first_player_name
+        self.SECOND_PLAYER_NAME: str = second_player_name
+        self.moves: array = moves
+        self.game_state: GameState = game_state
+        self.winner: str = winner
+        self.termination_message: str = termination_message
+        self.illegal_move: object = illegal_move
+        self.wall_times: array = wall_times if wall_times is not None else array('d')
+        self.cpu_times: array = cpu_times if cpu_times is not None else array('d')
+        self.game_index: int = game_index
+
+    @staticmethod
+    def moves_typecode(columns: int) -> str:
+        """ The array typecode of the moves of a board with this many columns. """
+        for typecode in ['B', 'H', 'I', 'Q']:
+            if columns <= 1 << (8 * array(typecode).itemsize):
+                return typecode
+        raise Exception(f"Error, cannot record moves on a board of {columns} columns.")
+
+    @classmethod
+    def from_match(cls, match: ConnectXMatch, game_index: int = None) -> "GameRecord":
+        moves = [column for _, column in match.moves_played]
+        illegal_move = None
+        if match.game_state == GameState.ILLEGAL_MOVE:
+            illegal_move = moves.pop()
+        return cls(
+            match.COLUMNS,
+            match.ROWS,
+            match.WIN_LENGTH,
+            match.FIRST_PLAYER_NAME,
+            match.SECOND_PLAYER_NAME,
+            array(cls.moves_typecode(match.COLUMNS), [int(column) for column in moves]),
+            match.game_state,
+            match.winner,
+            match.termination_message,
+            illegal_move,
+            array('d', [wall_time for _, wall_time, _ in match.move_timings]),
+            array('d', [float("nan") if cpu_time is None else cpu_time for _, _, cpu_time in match.move_timings]),
+            game_index
+        )
+
+    def to_dict(self) -> Dict:
+        """ The record as JSON-compatible values. An illegal move that is not a number or a string is kept as its repr. """
+        illegal_move = self.illegal_move
+        if isinstance(illegal_move, np.generic):
+            illegal_move = illegal_move.item()
+        if not isinstance(illegal_move, (int, float, str, type(None))):
+            illegal_move = repr(illegal_move)
+        return {
+            "columns": self.COLUMNS,
+            "rows": self.ROWS,
+            "win_length": self.WIN_LENGTH,
+            "first_player_name": self.FIRST_PLAYER_NAME,
+            "second_player_name": self.SECOND_PLAYER_NAME,
+            "moves": list(self.moves),
+            "game_state": self.game_state.value,
+            "winner": self.winner,
+            "termination_message": self.termination_message,
+            "illegal_move": illegal_move,
+            "wall_times": list(self.wall_times),
+            "cpu_times": [None if cpu_time != cpu_time else cpu_time for cpu_time in self.cpu_times],
+            "game_index": self.game_index
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "GameRecord":
+        return cls(
+            data["columns"],
+            data["rows"],
+            data["win_length"],
+            data["first_player_name"],
+            data["second_player_name"],
+            array(cls.moves_typecode(data["columns"]), data["moves"]),
+            GameState(data["game_state"]),
+            data["winner"],
+            data["termination_message"],
+            data["illegal_move"],
+            array('d', data["wall_times"]),
+            array('d', [float("nan") if cpu_time is None else cpu_time for cpu_time in data["cpu_times"]]),
+            data["game_index"]
+        )
+
+    @property
+    def move_timings(self) -> List[Tuple[str, float, float]]:
+        """ The move timings in the format of ConnectXMatch.move_timings. Players alternate from the first player. """
+        players = [self.FIRST_PLAYER_NAME, self.SECOND_PLAYER_NAME]
+        return [
+            (players[move_number % 2], wall_time, None if cpu_time != cpu_time else cpu_time)
+            for move_number, (wall_time, cpu_time) in enumerate(zip(self.wall_times, self.cpu_times))
+        ]
+
+    def to_match(self) -> ConnectXMatch:
+        """ Rebuild the match by replaying the moves. """
+        match = ConnectXMatch(self.COLUMNS, self.ROWS, self.WIN_LENGTH, self.FIRST_PLAYER_NAME, self.SECOND_PLAYER_NAME)
+        # The match prints the outcome of illegal moves, errors and timeouts, which were already printed when the game was played
+        with contextlib.redirect_stdout(None):
+            for column in self.moves:
+                match.play_with_next_player(column)
+            next_player = match.SECOND_PLAYER_NAME if len(self.moves) % 2 else match.FIRST_PLAYER_NAME
+            if self.game_state == GameState.ILLEGAL_MOVE:
+                match.make_move(self.illegal_move, next_player)
+            elif self.game_state == GameState.AGENT_ERROR:
+                match.register_agent_error(next_player, self.termination_message)
+            elif self.game_state == GameState.TIME_LIMIT_EXCEEDED:
+                match.register_time_limit_exceeded(next_player)
+        match.move_timings = self.move_timings
+        return match
+
+
+# Agents of a GameExecutor worker by name, registered once when the worker starts
+_executor_agents: Dict[str, "Agent"] = {}
+
+
+def _register_executor_agents(agents: List["Agent"]) -> None:
+    _executor_agents.clear()
+    for agent in agents:
+        _executor_agents[agent.name] = agent
+
+
+def _play_executor_game(game_args: Tuple) -> Tuple[str, GameRecord]:
+    game_index, board_dimension, win_length, first_agent_name, second_agent_name, *options = game_args
+    return Matchup._play_single_game(
+        game_index, board_dimension, win_length, _executor_agents[first_agent_name], _executor_agents[second_agent_name], *options
+    )
+
+
+class GameExecutor:
+    """
+    A long-lived pool of worker processes that play games, created once and shared by Matchups,
+    MetaMatchups and Tournaments. The agents are sent to every worker once, when it starts, so agent
+    modules and agent state are loaded once per worker rather than once per pool, and games refer
+    to the agents by name.
+
+    Use it as a context manager, or close it when done.
+
+    Args:
+        agents (List[Agent]): Every agent the games may use. Names must be unique.
+        num_processes (int, optional): Number of worker processes. Defaults to CPU count.
+    """
+    def __init__(self, agents: List["Agent"], num_processes: int = None):
+        self.agent_names: List[str] = [agent.name for agent in agents]
+        if len(set(self.agent_names)) != len(self.agent_names):
+            raise Exception(f"Error, agent names must be unique in a GameExecutor: {self.agent_names}")
+        # Agent functions by name, to check that matchups play the agents the workers hold
+        self.agent_funcs: Dict[str, Callable] = {agent.name: agent.func for agent in agents}
+        self.num_processes: int = num_processes if num_processes is not None else mp.cpu_count()
+        self._pool = mp.Pool(self.num_processes, initializer=_register_executor_agents, initargs=(agents,))
+
+    def __enter__(self) -> "GameExecutor":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+    def check_agents(self, *agents: "Agent") -> None:
+        """ Check that the workers hold the agents, by name and function. Functions are compared with ==, as in get_agent_process. """
+        for agent in agents:
+            if agent.name not in self.agent_funcs:
+                raise Exception(f"Error, agent {agent.name} is not registered in the GameExecutor.")
+            if self.agent_funcs[agent.name] != agent.func:
+                raise Exception(f"Error, agent {agent.name} is registered in the GameExecutor with another function.")
+
+    def play_games(self, game_args: Iterable[Tuple], chunksize: int = 1, ordered: bool = False) -> Iterator[Tuple[str, GameRecord]]:
+        """
+        Play games in the workers.
+
+        Args:
+            game_args (Iterable[Tuple]): Arguments of Matchup._play_single_game for each game, with agent names instead of agents.
+            chunksize (int): Number of games sent to a worker at once.
+            ordered (bool): Yield the results in the order of game_args rather than in completion order.
+
+        Returns:
+            Iterator[Tuple[str, GameRecord]]: The winner and record of each game.
+        """
+        imap = self._pool.imap if ordered else self._pool.imap_unordered
+        return imap(_play_executor_game, game_args, chunksize=chunksize)
+
+    def close(self) -> None:
+        """ Wait for the games in progress and stop the workers. """
+        self._pool.close()
+        self._pool.join()
+
+    def terminate(self) -> None:
+        """ Stop the workers now. """
+        self._pool.terminate()
+        self._pool.join()
+
+
+class GameCheckpoint:
+    """
+    JSON Lines file of finished games, one line per game written as soon as the game is counted, so that
+    a tournament that stops can resume where it stopped. Games are keyed by their matchup, which is
+    identified by its two agents, by name and by the qualified name of their function, its geometry and
+    its seed, and by their index in the matchup. Games written by a run with another seed or other agent
+    functions are not counted, so they are played again rather than mixed in.
+
+    Args:
+        file_path (str): Path of the checkpoint file.
+        resume (bool): Load the games of an existing file and append to it, otherwise start a new file.
+    """
+    def __init__(self, file_path: str, resume: bool = False):
+        self.file_path: str = file_path
+        self._games: Dict[Tuple, Dict[int, GameRecord]] = {}
+        if resume and os.path.exists(file_path):
+            with open(file_path, "rb") as file:
+                data = file.read()
+            # A run killed while writing leaves an incomplete last line, which is dropped
+            complete_size = data.rfind(b"\n") + 1
+            for line in data[:complete_size].splitlines():
+                entry = json.loads(line)
+                record = GameRecord.from_dict(entry["record"])
+                self._games.setdefault(tuple(entry["matchup"]), {})[record.game_index] = record
+            os.truncate(file_path, complete_size)
+        self._file = open(file_path, "a" if resume else "w")
+
+    @staticmethod
+    def _function_name(func: Callable) -> str:
+        return f"{getattr(func, '__module__', None)}.{getattr(func, '__qualname__', type(func).__qualname__)}"
+
+    @staticmethod
+    def _matchup_key(matchup: "Matchup") -> Tuple:
+        return (
+            matchup.first_agent.name,
+            matchup.second_agent.name,
+            GameCheckpoint._function_name(matchup.first_agent.func),
+            GameCheckpoint._function_name(matchup.second_agent.func),
+            matchup.board_dimension.columns,
+            matchup.board_dimension.rows,
+            matchup.win_length,
+            matchup.seed
+        )
+
+    def __len__(self) -> int:
+        return sum(len(games) for games in self._games.values())
+
+    def finished_games(self, matchup: "Matchup") -> Dict[int, GameRecord]:
+        """ The records of the games of the matchup in the checkpoint, by game index. """
+        return dict(self._games.get(self._matchup_key(matchup), {}))
+
+    def add(self, matchup: "Matchup", record: GameRecord) -> None:
+        key = self._matchup_key(matchup)
+        self._games.setdefault(key, {})[record.game_index] = record
+        self._file.write(json.dumps({"matchup": list(key), "record": record.to_dict()}) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
 class BoardDimension:
     def __init__(
         self,
@@ -462,8 +1684,142 @@ class Agent:
         self.name: str = name
         self.func: Callable = func
 
+class LatencyStats:
+    """
+    Wall and CPU times of the moves of one agent, gathered over games.
+    Every move also records how full the board was, to show agents that slow down as the board fills.
+    """
+    # Board fill ranges reported separately, as fractions of the cells
+    FILL_RANGES: List[Tuple[float, float]] = [(0.0, 1 / 3), (1 / 3, 2 / 3), (2 / 3, 1.0)]
+
+    def __init__(self):
+        self.wall_times: array = array('d')
+        # NaN when the CPU time of the move is unknown
+        self.cpu_times: array = array('d')
+        self.board_fills: array = array('d')
+
+    def __len__(self) -> int:
+        return len(self.wall_times)
+
+    def add_game(self, game: "GameRecord", player: str) -> None:
+        """ Add the moves of a player in a finished game, given as a GameRecord or a ConnectXMatch. """
+        cells = game.COLUMNS * game.ROWS
+        for move_number, (move_player, wall_time, cpu_time) in enumerate(game.move_timings):
+            if move_player == player:
+                self.wall_times.append(wall_time)
+                self.cpu_times.append(float("nan") if cpu_time is None else cpu_time)
+                self.board_fills.append(move_number / cells)
+
+    def merge(self, other: "LatencyStats") -> None:
+        self.wall_times.extend(other.wall_times)
+        self.cpu_times.extend(other.cpu_times)
+        self.board_fills.extend(other.board_fills)
+
+    def get_report_lines(self, name: str, time_limit: float) -> List[str]:
+        """
+        Latency percentiles of the agent and its headroom, the time left before the time limit at the p99 and max wall times.
+        """
+        if len(self) == 0:
+            return [f"{name}: no moves timed"]
+        wall_times = np.frombuffer(self.wall_times, dtype=np.float64)
+        cpu_times = np.frombuffer(self.cpu_times, dtype=np.float64)
+        board_fills = np.frombuffer(self.board_fills, dtype=np.float64)
+        wall_p50, wall_p95, wall_p99 = np.percentile(wall_times, [50, 95, 99])
+        wall_max = wall_times.max()
+        lines = [
+            f"{name}: {len(self)} moves",
+            f"  Wall time: p50 {wall_p50:.4f}s, p95 {wall_p95:.4f}s, p99 {wall_p99:.4f}s, max {wall_max:.4f}s",
+        ]
+        if not np.isnan(cpu_times).all():
+            cpu_p50, cpu_p95, cpu_p99 = np.nanpercentile(cpu_times, [50, 95, 99])
+            lines.append(f"  CPU time: p50 {cpu_p50:.4f}s, p95 {cpu_p95:.4f}s, p99 {cpu_p99:.4f}s, max {np.nanmax(cpu_times):.4f}s")
+        lines.append(
+            f"  Headroom: {time_limit - wall_p99:.4f}s at p99 ({(1 - wall_p99 / time_limit) * 100:.1f}% of the time limit), "
+            f"{time_limit - wall_max:.4f}s at max"
+        )
+        fill_lines = []
+        for low, high in self.FILL_RANGES:
+            in_range = (board_fills >= low) & ((board_fills < high) | (high == 1.0))
+            if in_range.any():
+                fill_lines.append(f"{low * 100:.0f}-{high * 100:.0f}% {np.percentile(wall_times[in_range], 95):.4f}s")
+        lines.append("  Wall time p95 by board fill: " + ", ".join(fill_lines))
+        return lines
+
+
+
+class PairSequentialTest:
+    """
+    Sequential test of the verdict of Matchup.determine_winner, fed with colour-swapped pairs of games.
+
+    The verdict depends on d, the first agent's win rate minus the second agent's, against the threshold t.
+    A pair scores the first agent's points over its two games, with a draw worth half a point, so the
+    mean pair score is (1 + d) / 2. Four one-sided tests reject d <= t, d >= -t, d >= t and d <= -t.
+    Each is a mixture SPRT: the average, over a grid of alternatives, of the Wald likelihood ratio of
+    the pair scores, taken as Bernoulli outcomes that may be fractional. The likelihood ratio stays
+    a supermartingale under the null for fractional outcomes, so a test rejects once the average
+    reaches 2 / error_rate, with an error of at most error_rate / 2 however long it runs.
+    Rejecting d <= t gives the first agent, rejecting d >= -t the second agent, and rejecting both
+    d >= t and d <= -t gives no clear winner. Every verdict is wrong with probability at most error_rate.
+    The verdict is taken from the current averages, so later pairs that move the evidence back withdraw it,
+    and the error rate holds whenever play stops. A test only rejects while the mean pair score is past its
+    boundary, so the verdict always agrees with determine_winner on the pairs played.
+
+    Args:
+        threshold (float): The threshold t, as a fraction in [0, 1).
+        error_rate (float): Probability of a wrong verdict.
+    """
+    FIRST_AGENT: int = 1
+    SECOND_AGENT: int = -1
+    NO_CLEAR_WINNER: int = 0
+    # Alternatives of each test, as fractions of the distance from the null boundary to the extreme pair score
+    ALTERNATIVES: np.ndarray = np.array([1 / 32, 1 / 16, 1 / 8, 1 / 4, 1 / 2, 3 / 4, 15 / 16])
+
+    def __init__(self, threshold: float, error_rate: float):
+        if not 0 <= threshold < 1:
+            raise Exception(f"Error, the threshold of a sequential test must be in [0, 1), not {threshold}.")
+        self.threshold: float = threshold
+        self.error_rate: float = error_rate
+        self.pairs: int = 0
+        # Null boundaries of the mean pair score, and whether the alternatives are above them
+        self._boundaries: np.ndarray = np.array([1 + threshold, 1 - threshold, 1 + threshold, 1 - threshold]) / 2
+        self._above: np.ndarray = np.array([True, False, False, True])
+        # Log-likelihood ratio of every (test, alternative)
+        self._log_ratios: np.ndarray = np.zeros((4, len(self.ALTERNATIVES)))
+
+    def add_pair(self, first_agent_points: float) -> int:
+        """
+        Add a pair of games and return the verdict, or None while it is undecided.
+
+        Args:
+            first_agent_points (float): Points of the first agent in the pair, from 0 to 2.
+        """
+        self.pairs += 1
+        score = first_agent_points / 2
+        # Likelihood ratio of a score against the null boundary m: 1 + g (score - m) / m for an alternative above,
+        # 1 + g (m - score) / (1 - m) for an alternative below, where g is the fraction of the alternative
+        steps = np.where(self._above, (score - self._boundaries) / self._boundaries, (self._boundaries - score) / (1 - self._boundaries))
+        self._log_ratios += np.log1p(steps[:, None] * self.ALTERNATIVES[None, :])
+        rejected = np.exp(self._log_ratios).mean(axis=1) >= 2 / self.error_rate
+        if rejected[0]:
+            return self.FIRST_AGENT
+        if rejected[1]:
+            return self.SECOND_AGENT
+        if rejected[2] and rejected[3]:
+            return self.NO_CLEAR_WINNER
+        return None
+
 
 class Matchup:
+    """
+    Games between two agents on one board geometry, the first agent starting the games of even index.
+
+    A move gets time_limit seconds. Agents run in the calling process or in a thread of their own are
+    timed by wall-clock time. With enable_process_isolation, the limit applies to the CPU time the agent
+    process measures for the move, and a separate wall-clock rule also counts a move as a timeout, killing
+    the agent process, when no answer arrives within agent_process.WALL_TIME_FACTOR times the limit plus
+    agent_process.WALL_TIME_MARGIN_S. Agents that sleep or wait on I/O use little CPU time, so the
+    wall-clock rule is the one that bounds them.
+    """
     def __init__(
         self,
         board_dimension: BoardDimension,
@@ -472,7 +1828,11 @@ class Matchup:
         second_agent: Agent,
         time_limit: int,
         win_percentage_threshold_for_win: float,
-        enable_thread_protection: bool = True
+        enable_thread_protection: bool = True,
+        enable_process_isolation: bool = False,
+        executor: GameExecutor = None,
+        seed: int = None,
+        checkpoint: GameCheckpoint = None
     ):
         self.board_dimension: BoardDimension = board_dimension
         self.win_length: int = win_length
@@ -481,6 +1841,18 @@ class Matchup:
         self.win_percentage_threshold_for_win: float = win_percentage_threshold_for_win
         self.time_limit: float = time_limit
         self.enable_thread_protection: bool = enable_thread_protection
+        self.enable_process_isolation: bool = enable_process_isolation
+        # Shared worker pool for the parallel methods, which otherwise start a pool of their own
+        self.executor: GameExecutor = executor
+        # Master seed of the matchup, each game is seeded with derive_seed(seed, game index), see replay_game
+        self.seed: int = seed
+        # Games are numbered across calls, and the first agent starts the games of even index
+        self.games_started: int = 0
+        # Every finished game is written to the checkpoint, and games restored from it are not played again
+        self.checkpoint: GameCheckpoint = checkpoint
+        self.restored_game_indices: set = set()
+        # Winner of every counted game, by game index, which play_n_games_adaptive pairs up
+        self.game_winners: Dict[int, str] = {}
 
         self.first_player_wins: int = 0
         self.second_player_wins: int = 0
@@ -489,55 +1861,149 @@ class Matchup:
         self.saved_player_1_games: List[ConnectXMatch] = []
         self.saved_player_2_games: List[ConnectXMatch] = []
 
+        # Maximum number of games of the last play_n_games_adaptive run, None if it was not used
+        self.adaptive_max_games: int = None
+
+        # Move timings of every game, by agent name
+        self.latency_stats: Dict[str, LatencyStats] = {first_agent.name: LatencyStats(), second_agent.name: LatencyStats()}
+
         self.percentage_first_player_wins: float = None
         self.percentage_second_player_wins: float = None
         self.percentage_draws: float = None
         self.winner: str = None
 
+    def _game_seed(self, game_index: int) -> int:
+        return derive_seed(self.seed, game_index) if self.seed is not None else None
+
+    def _start_game_indices(self, number_of_games: int) -> List[int]:
+        """ Take the indices of the next games, skipping the games restored from the checkpoint. """
+        game_indices = []
+        while len(game_indices) < number_of_games:
+            if self.games_started not in self.restored_game_indices:
+                game_indices.append(self.games_started)
+            self.games_started += 1
+        return game_indices
+
+    def restore_games(self, records: Dict[int, GameRecord]) -> None:
+        """ Count games finished in an earlier run, by game index, so that they are not played again. """
+        for game_index in sorted(records):
+            self._count_game_result(records[game_index].winner, records[game_index])
+            self.restored_game_indices.add(game_index)
+            self.game_winners[game_index] = records[game_index].winner
+        self.update_analytics()
+
+    def _create_game(self, game_index: int, seed: int = None) -> ConnectXMatchWithAgents:
+        if game_index % 2 == 0:
+            current_agent, opponent_agent = self.first_agent, self.second_agent
+        else:
+            current_agent, opponent_agent = self.second_agent, self.first_agent
+        return ConnectXMatchWithAgents(
+            self.board_dimension.columns,
+            self.board_dimension.rows,
+            self.win_length,
+            current_agent.name,
+            opponent_agent.name,
+            current_agent.func,
+            opponent_agent.func,
+            self.time_limit,
+            self.enable_thread_protection,
+            self.enable_process_isolation,
+            seed
+        )
+
     def play_n_games(self, number_of_games: int):
-        current_agent: Agent = self.first_agent
-        opponent_agent: Agent = self.second_agent
-        
-        for i in range(number_of_games):
+        for i in self._start_game_indices(number_of_games):
             print(f"Playing game: {i}")
-            game = ConnectXMatchWithAgents(
-                self.board_dimension.columns,
-                self.board_dimension.rows,
-                self.win_length,
-                current_agent.name,
-                opponent_agent.name,
-                current_agent.func,
-                opponent_agent.func,
-                self.time_limit,
-                self.enable_thread_protection
-            )
+            game = self._create_game(i, self._game_seed(i))
             winner = game.play_full_game()
-            if winner == self.first_agent.name:
-                self.first_player_wins += 1
-                if len(self.saved_player_1_games) < 5:
-                    self.saved_player_1_games.append(game.game)
-            elif winner == self.second_agent.name:
-                self.second_player_wins += 1
-                if len(self.saved_player_2_games) < 5:
-                    self.saved_player_2_games.append(game.game)
-            else:
-                self.draws += 1
+            self._record_game_result(winner, game.game, i)
             
             # Update analytics after each game
             self.update_analytics()
+
+    def replay_game(self, game_index: int) -> ConnectXMatch:
+        """
+        Play the game of the given index again, with the same starting player and seed, without counting it.
+        Agents whose only randomness comes from random and np.random, and that do not carry state from game
+        to game, play the same moves again, whichever runner and worker played the game first.
+
+        Args:
+            game_index (int): Index of the game in the matchup, counting from 0 across all the calls that played games.
+
+        Returns:
+            ConnectXMatch: The replayed game.
+        """
+        if self.seed is None:
+            raise Exception("Error, only the games of a matchup with a seed can be replayed.")
+        game = self._create_game(game_index, self._game_seed(game_index))
+        game.play_full_game()
+        return game.game
             
-            # Switch players
-            current_agent, opponent_agent = opponent_agent, current_agent
-            
+    def play_n_games_adaptive(self, max_games: int, error_rate: float = 0.05) -> int:
+        """
+        Play games in pairs, one with each agent starting, until the verdict of determine_winner is settled
+        by a PairSequentialTest at the given error rate, or max_games have been played.
+        Pair k is made of the games of index 2k and 2k + 1, and the test takes the pairs in index order.
+        Pairs whose games are already counted, such as games restored from a checkpoint, go to the test
+        before any game is played, so a resumed matchup that had stopped plays nothing, and only the missing
+        games of the other pairs are played.
+        With an executor, batches of pairs keep all its workers busy, so the verdict keeps its error rate but
+        a batch may play a few pairs past the stopping point.
+
+        Args:
+            max_games (int): Maximum number of games, counting the games already counted, rounded down to a whole number of pairs.
+            error_rate (float): Probability that the verdict differs from the verdict of infinitely many games.
+
+        Returns:
+            int: The number of games in the verdict, counting the games already counted.
+        """
+        self.adaptive_max_games = max_games
+        sequential_test = PairSequentialTest(self.win_percentage_threshold_for_win / 100, error_rate)
+        pairs_per_batch = max(1, self.executor.num_processes // 2) if self.executor is not None else 1
+        max_pairs = max_games // 2
+        verdict = None
+        while True:
+            while sequential_test.pairs < max_pairs:
+                pair_winners = [self.game_winners.get(2 * sequential_test.pairs + i) for i in range(2)]
+                if None in pair_winners:
+                    break
+                first_agent_points = sum(
+                    1.0 if winner == self.first_agent.name else 0.0 if winner == self.second_agent.name else 0.5
+                    for winner in pair_winners
+                )
+                verdict = sequential_test.add_pair(first_agent_points)
+            if verdict is not None or sequential_test.pairs == max_pairs:
+                break
+            batch_pairs = range(sequential_test.pairs, min(sequential_test.pairs + pairs_per_batch, max_pairs))
+            self._play_games_at([i for pair in batch_pairs for i in (2 * pair, 2 * pair + 1) if i not in self.game_winners])
+        self.update_analytics()
+        return 2 * sequential_test.pairs
+
+    def _play_games_at(self, game_indices: List[int]) -> None:
+        """ Play and count the games of the given indices, in the executor of the matchup if it has one. """
+        self.games_started = max(self.games_started, max(game_indices) + 1)
+        if self.executor is None:
+            for i in game_indices:
+                print(f"Playing game: {i}")
+                game = self._create_game(i, self._game_seed(i))
+                winner = game.play_full_game()
+                self._record_game_result(winner, game.game, i)
+                self.update_analytics()
+            return
+        for winner, record in self._imap_games(game_indices, self.executor.num_processes, chunksize=1, ordered=True):
+            self._record_game_result(winner, record, record.game_index)
+        self.update_analytics()
+
     @staticmethod
     def _play_single_game(game_index: int, board_dimension: BoardDimension, win_length: int, 
                          first_agent: Agent, second_agent: Agent, time_limit: float, 
-                         enable_thread_protection: bool, start_with_first_agent: bool) -> Tuple[str, ConnectXMatch]:
+                         enable_thread_protection: bool, start_with_first_agent: bool,
+                         enable_process_isolation: bool = False, game_seed: int = None) -> Tuple[str, GameRecord]:
         """
         Worker function to play a single game for parallelism.
         
         Returns:
-            Tuple[str, ConnectXMatch]: The winner of the game and the game object
+            Tuple[str, GameRecord]: The winner of the game and a compact record of the game
         """
         print(f"Playing game: {game_index}")
         
@@ -557,58 +2023,167 @@ class Matchup:
             current_agent.func,
             opponent_agent.func,
             time_limit,
-            enable_thread_protection
+            enable_thread_protection,
+            enable_process_isolation,
+            game_seed
         )
         
         winner = game.play_full_game()
-        return (winner, game.game)
+        return (winner, GameRecord.from_match(game.game, game_index))
             
     def play_n_games_with_parallelism(self, number_of_games: int, num_processes: int = None):
         """
-        Play multiple games in parallel using multiprocessing.
+        Play multiple games in parallel using multiprocessing, in the executor of the matchup if it has one.
         
         Args:
             number_of_games (int): Number of games to play
-            num_processes (int, optional): Number of processes to use. Defaults to CPU count.
+            num_processes (int, optional): Number of processes to use, ignored with an executor. Defaults to CPU count.
         """ 
         if num_processes is None:
             num_processes = mp.cpu_count()
         
-        # Prepare arguments for each game, alternating which player starts
-        game_args = []
-        for i in range(number_of_games):
-            start_with_first_agent = (i % 2 == 0)  # Alternate starting player
-            game_args.append((
-                i,  # game_index
-                self.board_dimension,  # board_dimension
-                self.win_length,  # win_length
-                self.first_agent,  # first_agent
-                self.second_agent,  # second_agent
-                self.time_limit,  # time_limit
-                self.enable_thread_protection,  # enable_thread_protection
-                start_with_first_agent  # start_with_first_agent
-            ))
-        
-        # Play games in parallel
-        with mp.Pool(processes=num_processes) as pool:
-            results = pool.starmap(Matchup._play_single_game, game_args)
+        # Play games in parallel, and take the results in game order so that the saved games do not depend on timing
+        results = self._imap_games(self._start_game_indices(number_of_games), num_processes, chunksize=1, ordered=True)
         
         # Process results
-        for winner, game in results:
-            if winner == self.first_agent.name:
-                self.first_player_wins += 1
-                if len(self.saved_player_1_games) < 5:
-                    self.saved_player_1_games.append(game)
-            elif winner == self.second_agent.name:
-                self.second_player_wins += 1
-                if len(self.saved_player_2_games) < 5:
-                    self.saved_player_2_games.append(game)
-            else:
-                self.draws += 1
+        for winner, record in results:
+            self._record_game_result(winner, record, record.game_index)
         
         # Update analytics after all games
         self.update_analytics()
 
+    @staticmethod
+    def _play_single_game_from_args(game_args: Tuple) -> Tuple[str, GameRecord]:
+        return Matchup._play_single_game(*game_args)
+
+    def _game_args(self, game_indices: List[int], by_name: bool = False) -> Iterator[Tuple]:
+        """
+        Arguments of _play_single_game for each of the games of the given indices, generated as they are consumed.
+        With by_name, the agents are given by name, for a GameExecutor.
+        """
+        if by_name:
+            first_agent, second_agent = self.first_agent.name, self.second_agent.name
+        else:
+            first_agent, second_agent = self.first_agent, self.second_agent
+        return (
+            (
+                i,
+                self.board_dimension,
+                self.win_length,
+                first_agent,
+                second_agent,
+                self.time_limit,
+                self.enable_thread_protection,
+                i % 2 == 0,
+                self.enable_process_isolation,
+                self._game_seed(i)
+            )
+            for i in game_indices
+        )
+
+    def _imap_games(self, game_indices: List[int], num_processes: int, chunksize: int, ordered: bool = False) -> Iterator[Tuple[str, GameRecord]]:
+        """
+        Play the games of the given indices in the executor of the matchup, or in a pool of its own,
+        and yield the results in completion order, or in game order with ordered.
+        """
+        if self.executor is not None:
+            self.executor.check_agents(self.first_agent, self.second_agent)
+            yield from self.executor.play_games(self._game_args(game_indices, by_name=True), chunksize, ordered)
+            return
+        with mp.Pool(processes=num_processes) as pool:
+            imap = pool.imap if ordered else pool.imap_unordered
+            yield from imap(Matchup._play_single_game_from_args, self._game_args(game_indices), chunksize=chunksize)
+
+    def play_n_games_streaming(
+        self,
+        number_of_games: int,
+        num_processes: int = None,
+        chunksize: int = None,
+        progress_callback: Callable[[int, int], None] = None
+    ):
+        """
+        Play games in parallel like play_n_games_with_parallelism, but count each game as soon as it finishes.
+        Results arrive in completion order, the counters and analytics are updated for every game,
+        and only the games that are saved are kept. Unlike play_n_games_with_parallelism, which the same
+        seed plays into the same saved games, the saved games, the progress callbacks and the order of the
+        checkpoint lines depend on which games finish first.
+
+        Args:
+            number_of_games (int): Number of games to play.
+            num_processes (int, optional): Number of processes to use, ignored with an executor. Defaults to CPU count.
+            chunksize (int, optional): Number of games sent to a worker at once. Larger chunks cut the per-task
+                overhead of cheap games. Defaults to about four chunks per process.
+            progress_callback (Callable[[int, int], None], optional): Called with the number of games done and the total.
+        """
+        if num_processes is None:
+            num_processes = self.executor.num_processes if self.executor is not None else mp.cpu_count()
+        if chunksize is None:
+            chunksize = max(1, number_of_games // (num_processes * 4))
+
+        results = self._imap_games(self._start_game_indices(number_of_games), num_processes, chunksize)
+        for games_done, (winner, record) in enumerate(results, start=1):
+            self._record_game_result(winner, record, record.game_index)
+            self.update_analytics()
+            if progress_callback is not None:
+                progress_callback(games_done, number_of_games)
+        self.update_analytics()
+
+    async def play_n_games_async(self, number_of_games: int, max_concurrent_games: int = 100):
+        """
+        Play games concurrently on the running event loop, alternating the starting player as play_n_games does.
+        Agent moves are awaited with asyncio.wait_for, see ConnectXMatchWithAgents.play_move_with_agent_async,
+        so games whose agents are waiting on I/O, subprocesses or remote workers overlap.
+        Agent functions may be called by several games at once. The games share the global random generators,
+        so they are not seeded and replay_game does not reproduce them.
+
+        Args:
+            number_of_games (int): Number of games to play.
+            max_concurrent_games (int): Maximum number of games in flight. Agent functions that are not coroutine
+                functions run in a thread of their own for every move.
+        """
+        semaphore = asyncio.Semaphore(max_concurrent_games)
+
+        async def play_game(game_index: int) -> None:
+            async with semaphore:
+                game = self._create_game(game_index)
+                winner = await game.play_full_game_async()
+            self._record_game_result(winner, game.game, game_index)
+            self.update_analytics()
+
+        await asyncio.gather(*[play_game(game_index) for game_index in self._start_game_indices(number_of_games)])
+        self.update_analytics()
+
+    def play_n_games_concurrently(self, number_of_games: int, max_concurrent_games: int = 100):
+        """ Run play_n_games_async on a new event loop and wait for all the games. """
+        asyncio.run(self.play_n_games_async(number_of_games, max_concurrent_games))
+
+    def _record_game_result(self, winner: str, game, game_index: int) -> None:
+        """
+        Count a finished game, see _count_game_result, and write it to the checkpoint if there is one.
+        """
+        self._count_game_result(winner, game)
+        self.game_winners[game_index] = winner
+        if self.checkpoint is not None:
+            self.checkpoint.add(self, game if isinstance(game, GameRecord) else GameRecord.from_match(game, game_index))
+
+    def _count_game_result(self, winner: str, game) -> None:
+        """
+        Count a finished game, keep it if fewer than 5 games of its winner are saved, and add its move timings.
+        The game is a ConnectXMatch or a GameRecord, and a record that is kept is rebuilt into a match.
+        """
+        for name, stats in self.latency_stats.items():
+            stats.add_game(game, name)
+        if winner == self.first_agent.name:
+            self.first_player_wins += 1
+            if len(self.saved_player_1_games) < 5:
+                self.saved_player_1_games.append(game.to_match() if isinstance(game, GameRecord) else game)
+        elif winner == self.second_agent.name:
+            self.second_player_wins += 1
+            if len(self.saved_player_2_games) < 5:
+                self.saved_player_2_games.append(game.to_match() if isinstance(game, GameRecord) else game)
+        else:
+            self.draws += 1
+
     def update_analytics(self):
         total_games = self.first_player_wins + self.second_player_wins + self.draws
         if total_games == 0:
@@ -653,6 +2228,10 @@ class Matchup:
             f"Draws: {self.draws} ({self.percentage_draws})",
             "",
             f"Winner: {self.winner}",
+            *([f"Adaptive Stopping: {total_games} of at most {self.adaptive_max_games} games played"] if self.adaptive_max_games is not None else []),
+            "",
+            "Move Latency:",
+            *[line for name, stats in self.latency_stats.items() for line in stats.get_report_lines(name, self.time_limit)],
             "========================"
         ]
         
@@ -687,7 +2266,12 @@ class MetaMatchup:
         turn_time_limit_s: int,
         win_percentage_threshold_for_win: float,
         number_of_games_per_matchup: int,
-        enable_thread_protection: bool = True
+        enable_thread_protection: bool = True,
+        enable_process_isolation: bool = False,
+        adaptive_error_rate: float = None,
+        executor: GameExecutor = None,
+        seed: int = None,
+        checkpoint: GameCheckpoint = None
     ):
         # Parameters
         self.board_dimensions: List[BoardDimension] = board_dimensions
@@ -698,6 +2282,16 @@ class MetaMatchup:
         self.win_percentage_threshold_for_win: float = win_percentage_threshold_for_win
         self.number_of_games_per_matchup: int = number_of_games_per_matchup
         self.enable_thread_protection: bool = enable_thread_protection
+        self.enable_process_isolation: bool = enable_process_isolation
+        # With an error rate, matchups stop early once their verdict is settled, see Matchup.play_n_games_adaptive,
+        # and number_of_games_per_matchup is the maximum number of games
+        self.adaptive_error_rate: float = adaptive_error_rate
+        # With a shared GameExecutor, the games of every matchup are played in its workers
+        self.executor: GameExecutor = executor
+        # Master seed, the matchup of index i gets the seed derive_seed(seed, i)
+        self.seed: int = seed
+        # Checkpoint of finished games, see GameCheckpoint. Only play_matchups uses it.
+        self.checkpoint: GameCheckpoint = checkpoint
 
         # Matchups
         self.matchups: List[Matchup] = []
@@ -712,47 +2306,73 @@ class MetaMatchup:
         self.overall_percentage_draws: float = None
         self.overall_winner: str = None
     
+    def _matchup_seed(self, matchup_index: int) -> int:
+        return derive_seed(self.seed, matchup_index) if self.seed is not None else None
+
     def play_matchups(self):
-        for board_dimension in self.board_dimensions:
-            for win_length in self.win_lengths:
-                matchup = Matchup(
-                    board_dimension,
-                    win_length,
-                    self.first_agent,
-                    self.second_agent,
-                    self.turn_time_limit_s,
-                    self.win_percentage_threshold_for_win,
-                    self.enable_thread_protection
-                )
-                matchup.play_n_games(self.number_of_games_per_matchup)
-                self.matchups.append(matchup)
+        for matchup_index, (board_dimension, win_length) in enumerate(itertools.product(self.board_dimensions, self.win_lengths)):
+            matchup = Matchup(
+                board_dimension,
+                win_length,
+                self.first_agent,
+                self.second_agent,
+                self.turn_time_limit_s,
+                self.win_percentage_threshold_for_win,
+                self.enable_thread_protection,
+                self.enable_process_isolation,
+                self.executor,
+                self._matchup_seed(matchup_index),
+                self.checkpoint
+            )
+            number_of_games = self.number_of_games_per_matchup
+            if self.checkpoint is not None:
+                finished_games = self.checkpoint.finished_games(matchup)
+                matchup.restore_games(finished_games)
+                number_of_games = max(0, number_of_games - len(finished_games))
+            if self.adaptive_error_rate is not None:
+                # The restored games count towards the maximum, and the sequential test takes them first
+                matchup.play_n_games_adaptive(self.number_of_games_per_matchup, self.adaptive_error_rate)
+            elif self.executor is not None:
+                matchup.play_n_games_with_parallelism(number_of_games)
+            else:
+                matchup.play_n_games(number_of_games)
+            self.matchups.append(matchup)
         self.analyse_matchups()
 
-    def play_matchup_in_process(matchup_data: Tuple[BoardDimension, int, Agent, Agent, int, float, int, bool], results_list: List[Matchup]):
+    def play_matchup_in_process(matchup_data: Tuple[BoardDimension, int, Agent, Agent, int, float, int, bool, bool, float, int], results_list: List[Matchup]):
         """Worker function to run play_matchup() and store results."""
-        board_dimension, win_length, first_agent, second_agent, time_limit, win_percentage_threshold, num_games, enable_thread_protection = matchup_data
-        matchup = Matchup(board_dimension, win_length, first_agent, second_agent, time_limit, win_percentage_threshold, enable_thread_protection)
-        matchup.play_n_games(num_games)
+        board_dimension, win_length, first_agent, second_agent, time_limit, win_percentage_threshold, num_games, enable_thread_protection, enable_process_isolation, adaptive_error_rate, seed = matchup_data
+        matchup = Matchup(board_dimension, win_length, first_agent, second_agent, time_limit, win_percentage_threshold, enable_thread_protection, enable_process_isolation, seed=seed)
+        if adaptive_error_rate is None:
+            matchup.play_n_games(num_games)
+        else:
+            matchup.play_n_games_adaptive(num_games, adaptive_error_rate)
         results_list.append(matchup)
 
     def play_parallel_matchups(self):
+        if self.executor is not None:
+            # The games of each matchup are already spread over the workers of the executor
+            self.play_matchups()
+            return
         with mp.Manager() as manager:
             shared_results: List[Matchup] = manager.list()
             matchups_data = []
-            for board_dimension in self.board_dimensions:
-                for win_length in self.win_lengths:
-                    print(f"Playing matchup between {self.first_agent.name} and {self.second_agent.name}")
-                    matchup_data: Tuple[BoardDimension, int, Agent, Agent, int, float, int, bool] = (
-                        board_dimension,
-                        win_length,
-                        self.first_agent,
-                        self.second_agent,
-                        self.turn_time_limit_s,
-                        self.win_percentage_threshold_for_win,
-                        self.number_of_games_per_matchup,
-                        self.enable_thread_protection
-                    )
-                    matchups_data.append(matchup_data)
+            for matchup_index, (board_dimension, win_length) in enumerate(itertools.product(self.board_dimensions, self.win_lengths)):
+                print(f"Playing matchup between {self.first_agent.name} and {self.second_agent.name}")
+                matchup_data: Tuple[BoardDimension, int, Agent, Agent, int, float, int, bool, bool, float, int] = (
+                    board_dimension,
+                    win_length,
+                    self.first_agent,
+                    self.second_agent,
+                    self.turn_time_limit_s,
+                    self.win_percentage_threshold_for_win,
+                    self.number_of_games_per_matchup,
+                    self.enable_thread_protection,
+                    self.enable_process_isolation,
+                    self.adaptive_error_rate,
+                    self._matchup_seed(matchup_index)
+                )
+                matchups_data.append(matchup_data)
             with mp.Pool(mp.cpu_count()) as pool:
                 pool.starmap(MetaMatchup.play_matchup_in_process, [(matchup_data, shared_results) for matchup_data in matchups_data])
             self.matchups = list(shared_results)
@@ -769,6 +2389,14 @@ class MetaMatchup:
         # Decide the winner, if winner there is.
         self.overall_winner = self.determine_overall_winner()
         
+    def get_latency_stats(self) -> Dict[str, LatencyStats]:
+        """ Move timings of both agents over all the matchups. """
+        latency_stats = {self.first_agent.name: LatencyStats(), self.second_agent.name: LatencyStats()}
+        for matchup in self.matchups:
+            for name, stats in matchup.latency_stats.items():
+                latency_stats[name].merge(stats)
+        return latency_stats
+
     def determine_overall_winner(self) -> str:
         if self.overall_percentage_first_player_wins >= self.overall_percentage_second_player_wins + self.win_percentage_threshold_for_win:
             return self.first_agent.name
@@ -809,6 +2437,9 @@ class MetaMatchup:
             f"Draws: {self.overall_draws} ({self.overall_percentage_draws})",
             "",
             f"Winner: {self.overall_winner}",
+            "",
+            "Move Latency:",
+            *[line for name, stats in self.get_latency_stats().items() for line in stats.get_report_lines(name, self.turn_time_limit_s)],
             "========================",
             "",
             "",
@@ -835,7 +2466,10 @@ class Tournament:
         agents: List[Agent],
         turn_time_limit_s: int,
         win_percentage_threshold_for_win: float,
-        number_of_games_per_matchup: int
+        number_of_games_per_matchup: int,
+        adaptive_error_rate: float = None,
+        executor: GameExecutor = None,
+        seed: int = None
     ):
         # Parameters
         self.board_dimensions: List[BoardDimension] = board_dimensions
@@ -844,6 +2478,12 @@ class Tournament:
         self.turn_time_limit_s: int = turn_time_limit_s
         self.win_percentage_threshold_for_win: float = win_percentage_threshold_for_win
         self.number_of_games_per_matchup: int = number_of_games_per_matchup
+        # See MetaMatchup.adaptive_error_rate
+        self.adaptive_error_rate: float = adaptive_error_rate
+        # See MetaMatchup.executor
+        self.executor: GameExecutor = executor
+        # Master seed, the meta matchup of index i gets the seed derive_seed(seed, i)
+        self.seed: int = seed
 
         # Meta Matchups
         self.meta_matchups: List[MetaMatchup] = []
@@ -855,8 +2495,37 @@ class Tournament:
         self.agents_metamatchup_wins[NO_WINNER_STATE] = 0
         self.overall_winner: str = None
 
-    def play_tournament(self, file_dir: str = None, enable_thread_protection: bool = True):
-        for agent_1, agent_2 in itertools.combinations(self.agents, 2):
+    def play_tournament(
+        self,
+        file_dir: str = None,
+        enable_thread_protection: bool = True,
+        enable_process_isolation: bool = False,
+        checkpoint_path: str = None,
+        resume: bool = False
+    ):
+        """
+        Play every meta matchup, writing its report to file_dir if given.
+
+        Args:
+            file_dir (str): Directory of the meta matchup reports.
+            enable_thread_protection (bool): See ConnectXMatchWithAgents.
+            enable_process_isolation (bool): See ConnectXMatchWithAgents.
+            checkpoint_path (str): File where every finished game is written, see GameCheckpoint.
+            resume (bool): Count the games already in the checkpoint file and only play the missing games.
+                Otherwise, an existing checkpoint file is overwritten.
+        """
+        checkpoint = GameCheckpoint(checkpoint_path, resume) if checkpoint_path is not None else None
+        try:
+            self._play_meta_matchups(file_dir, enable_thread_protection, enable_process_isolation, checkpoint)
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+        self.analyse_tournament()
+
+    def _play_meta_matchups(
+        self, file_dir: str, enable_thread_protection: bool, enable_process_isolation: bool, checkpoint: GameCheckpoint
+    ) -> None:
+        for meta_matchup_index, (agent_1, agent_2) in enumerate(itertools.combinations(self.agents, 2)):
             print(f"Playing meta matchup between {agent_1.name} and {agent_2.name}")
             meta_matchup = MetaMatchup(
                 self.board_dimensions,
@@ -866,7 +2535,12 @@ class Tournament:
                 self.turn_time_limit_s,
                 self.win_percentage_threshold_for_win,
                 self.number_of_games_per_matchup,
-                enable_thread_protection
+                enable_thread_protection,
+                enable_process_isolation,
+                self.adaptive_error_rate,
+                self.executor,
+                derive_seed(self.seed, meta_matchup_index) if self.seed is not None else None,
+                checkpoint
             )
             meta_matchup.play_matchups()
             if file_dir is not None:
@@ -875,7 +2549,6 @@ class Tournament:
                     os.makedirs(file_dir)
                 meta_matchup.generate_report(file_path=file_dir + f"/{agent_1.name}_vs_{agent_2.name}.txt")
             self.meta_matchups.append(meta_matchup)
-        self.analyse_tournament()
 
     def analyse_tournament(self):
         for meta_matchup in self.meta_matchups:
@@ -887,6 +2560,14 @@ class Tournament:
                 
         self.overall_winner = self.determine_overall_winner()
 
+    def get_latency_stats(self) -> Dict[str, LatencyStats]:
+        """ Move timings of every agent over all the meta matchups. """
+        latency_stats = {agent.name: LatencyStats() for agent in self.agents}
+        for meta_matchup in self.meta_matchups:
+            for name, stats in meta_matchup.get_latency_stats().items():
+                latency_stats[name].merge(stats)
+        return latency_stats
+
     def determine_overall_winner(self) -> str:
         # No clear winner if two agents have the same number of wins
         max_wins = max(self.agents_metamatchup_wins.values())
@@ -918,6 +2599,9 @@ class Tournament:
             "",
             "Results:",
             f"Winner: {self.overall_winner}",
+            "",
+            "Move Latency:",
+            *[line for name, stats in self.get_latency_stats().items() for line in stats.get_report_lines(name, self.turn_time_limit_s)],
             "========================",
         ]
         with open(file_dir + "/tournament_result.txt", 'w') as file:
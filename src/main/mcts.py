@@ -0,0 +1,243 @@
+import math
+import random
+import time
+from array import array
+from typing import List, Optional
+
+import numpy as np
+
+from src.main.connect import Agent, ConnectXMatch, GameState, NumericObservation, numeric_observation
+
+
+class MCTS:
+    """
+    Monte Carlo tree search over a ConnectXMatch with UCT selection.
+
+    The tree is stored as parallel arrays indexed by node, and the children of a node are
+    allocated next to each other when it is expanded. The search walks a single copy of the
+    position with push/pop and plays rollouts inside the engine.
+    Between consecutive searches of the same game, the subtree below the moves played since
+    the previous search becomes the new root, so its statistics are kept.
+    The tree holds at most max_nodes nodes: a full tree stops expanding, so the rest of the search
+    only refines the statistics of its nodes, and the next search starts a new tree.
+    """
+    def __init__(
+        self,
+        exploration: float = math.sqrt(2),
+        rollout_policy: str = "random",
+        max_nodes: int = 2_000_000,
+        rng: random.Random = random
+    ):
+        self.exploration: float = exploration
+        self.rollout_policy: str = rollout_policy
+        self.max_nodes: int = max_nodes
+        self.rng: random.Random = rng
+
+        # Statistics of the last search
+        self.last_iterations: int = 0
+        self.last_reused_visits: int = 0
+
+        self.reset()
+
+    def reset(self) -> None:
+        """ Forget the whole tree. """
+        # Node store
+        self.parents: array = array('i')
+        self.moves: array = array('i')
+        # Index of the player who made the move into the node: 0 for the first player, 1 for the second
+        self.movers: array = array('b')
+        self.first_children: array = array('i')
+        self.child_counts: array = array('i')
+        self.visits: array = array('i')
+        # Sum of the rewards from the point of view of the player who made the move into the node
+        self.values: array = array('d')
+
+        self.root: int = -1
+        self.root_match: ConnectXMatch = None
+
+    def _add_node(self, parent: int, move: int, mover: int) -> int:
+        self.parents.append(parent)
+        self.moves.append(move)
+        self.movers.append(mover)
+        self.first_children.append(-1)
+        self.child_counts.append(0)
+        self.visits.append(0)
+        self.values.append(0.0)
+        return len(self.visits) - 1
+
+    @staticmethod
+    def _next_player_index(match: ConnectXMatch) -> int:
+        if match.previous_player_who_played is None:
+            return 0
+        return 0 if match.previous_player_who_played == match.SECOND_PLAYER_NAME else 1
+
+    def _moves_since_root(self, match: ConnectXMatch) -> Optional[List[int]]:
+        """
+        Find a move sequence that leads from the root position to the match position, alternating players.
+        Returns None when the match is not a continuation of the root position.
+        """
+        root_match = self.root_match
+        if (
+            root_match is None or
+            (root_match.COLUMNS, root_match.ROWS, root_match.WIN_LENGTH) != (match.COLUMNS, match.ROWS, match.WIN_LENGTH) or
+            (root_match.FIRST_PLAYER_NAME, root_match.SECOND_PLAYER_NAME) != (match.FIRST_PLAYER_NAME, match.SECOND_PLAYER_NAME) or
+            match.move_count < root_match.move_count
+        ):
+            return None
+        root_cells = root_match._cells
+        occupied = root_cells != 0
+        if not np.array_equal(root_cells[occupied], match._cells[occupied]):
+            return None
+
+        added = {1: [], 2: []}
+        for column, row in zip(*np.nonzero(match._cells != root_cells)):
+            added[int(match._cells[column, row])].append((int(column), int(row)))
+        heights = list(root_match.column_heights)
+        player_code = self._next_player_index(root_match) + 1
+        moves = []
+        for _ in range(match.move_count - root_match.move_count):
+            playable = [cell for cell in added[player_code] if heights[cell[0]] == cell[1]]
+            if not playable:
+                return None
+            column, row = playable[0]
+            added[player_code].remove((column, row))
+            heights[column] += 1
+            moves.append(column)
+            player_code = 3 - player_code
+        return moves
+
+    def _set_root(self, match: ConnectXMatch) -> None:
+        """ Move the root to the match position, reusing the existing subtree when possible. """
+        node = self.root
+        moves = self._moves_since_root(match)
+        if moves is not None:
+            for move in moves:
+                node = self._find_child(node, move)
+                if node < 0:
+                    break
+        if moves is None or node < 0 or len(self.visits) + match.COLUMNS > self.max_nodes:
+            self.reset()
+            node = self._add_node(-1, -1, 1 - self._next_player_index(match))
+        self.root = node
+        self.root_match = match.copy(enable_log=False)
+        self.last_reused_visits = self.visits[node]
+
+    def _find_child(self, node: int, move: int) -> int:
+        first_child = self.first_children[node]
+        for child in range(first_child, first_child + self.child_counts[node]):
+            if self.moves[child] == move:
+                return child
+        return -1
+
+    def _select_child(self, node: int) -> int:
+        first_child = self.first_children[node]
+        log_parent_visits = math.log(self.visits[node])
+        best_child = first_child
+        best_score = -math.inf
+        for child in range(first_child, first_child + self.child_counts[node]):
+            child_visits = self.visits[child]
+            if child_visits == 0:
+                return child
+            score = self.values[child] / child_visits + self.exploration * math.sqrt(log_parent_visits / child_visits)
+            if score > best_score:
+                best_score = score
+                best_child = child
+        return best_child
+
+    def _execute_iteration(self, match: ConnectXMatch) -> None:
+        node = self.root
+        depth = 0
+        # Selection
+        while self.child_counts[node] > 0:
+            node = self._select_child(node)
+            match.push(self.moves[node])
+            depth += 1
+        # Expansion, while the children fit in the tree
+        if (
+            match.game_state == GameState.IN_PROGRESS and (self.visits[node] > 0 or node == self.root) and
+            len(self.visits) + match.COLUMNS <= self.max_nodes
+        ):
+            mover = self._next_player_index(match)
+            legal_moves = match.getPossibleActions()
+            self.first_children[node] = len(self.visits)
+            self.child_counts[node] = len(legal_moves)
+            for move in legal_moves:
+                self._add_node(node, move, mover)
+            node = self.first_children[node] + self.rng.randrange(len(legal_moves))
+            match.push(self.moves[node])
+            depth += 1
+        # Simulation
+        reward = match.rollout(self.rollout_policy, self.rng)
+        for _ in range(depth):
+            match.pop()
+        # Backpropagation, up to the root only since a reused root keeps its old parent
+        while True:
+            self.visits[node] += 1
+            self.values[node] += reward if self.movers[node] == 0 else -reward
+            if node == self.root:
+                break
+            node = self.parents[node]
+
+    def search(self, match: ConnectXMatch, time_limit_s: float = None, iterations: int = None) -> int:
+        """
+        Search the match position and return the most visited move.
+
+        Args:
+            match (ConnectXMatch): The position to search, with the searching player to move.
+            time_limit_s (float): Time budget of the search in seconds.
+            iterations (int): Number of iterations, used when no time limit is given.
+
+        Returns:
+            int: The best column, or None if the game is over.
+        """
+        if match.game_state != GameState.IN_PROGRESS:
+            return None
+        if time_limit_s is None and iterations is None:
+            raise Exception("Error, the search needs a time limit or a number of iterations.")
+        self._set_root(match)
+        working_match = self.root_match.copy()
+
+        self.last_iterations = 0
+        deadline = time.perf_counter() + time_limit_s if time_limit_s is not None else None
+        while True:
+            if deadline is not None:
+                if time.perf_counter() >= deadline:
+                    break
+            elif self.last_iterations >= iterations:
+                break
+            self._execute_iteration(working_match)
+            self.last_iterations += 1
+
+        first_child = self.first_children[self.root]
+        if first_child < 0:
+            return self.rng.choice(match.getPossibleActions())
+        best_child = max(range(first_child, first_child + self.child_counts[self.root]), key=lambda child: self.visits[child])
+        return self.moves[best_child]
+
+
+class MCTSAgent:
+    """
+    Agent playing with MCTS, keeping its tree between the moves of a game.
+    Use the play method as the agent function.
+    """
+    def __init__(
+        self,
+        name: str,
+        time_limit_s: float = 1.0,
+        exploration: float = math.sqrt(2),
+        rollout_policy: str = "random"
+    ):
+        self.name: str = name
+        self.time_limit_s: float = time_limit_s
+        self.mcts: MCTS = MCTS(exploration, rollout_policy)
+
+    @numeric_observation
+    def play(self, board, win_length: int, opponent_name: str) -> int:
+        if isinstance(board, NumericObservation):
+            match: ConnectXMatch = ConnectXMatch.from_observation(board, win_length, self.name, opponent_name)
+        else:
+            match: ConnectXMatch = ConnectXMatch.from_board(board, win_length, self.name, opponent_name)
+        return self.mcts.search(match, time_limit_s=self.time_limit_s)
+
+    def as_agent(self) -> Agent:
+        return Agent(self.name, self.play)
@@ -0,0 +1,182 @@
+"""
+Opening books: the best move and value of every position of the first plies of a board geometry.
+
+Build a book from the repository root with:
+    python -m src.main.opening_book --columns 7 --rows 6 --win-length 4 --plies 4 --output book_7x6x4.bin
+
+The file holds a small header followed by fixed-size records sorted by canonical position key, so a
+lookup is a binary search in a memory-mapped array and every process reading the book shares the same
+pages. A position and its mirror image share one record, whose move is in the frame of the canonical key.
+"""
+import argparse
+import struct
+import time
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from src.main.connect import ConnectXMatch, GameState
+from src.main.solver import Solver, SOLVED_DEPTH
+
+
+BOOK_MAGIC: bytes = b"CXBOOK1\0"
+# Magic, columns, rows, win length, plies, number of records
+BOOK_HEADER: struct.Struct = struct.Struct("<8s4iQ")
+# The depth is SOLVED_DEPTH when the value is exact
+BOOK_DTYPE: np.dtype = np.dtype([("hash", "<u8"), ("move", "<i2"), ("depth", "<i2"), ("value", "<i8")])
+
+
+def enumerate_positions(columns: int, rows: int, win_length: int, plies: int) -> List[ConnectXMatch]:
+    """
+    List the distinct positions in progress reachable in at most `plies` moves, shallowest first.
+    Transpositions and mirror images of listed positions are left out.
+    """
+    root = ConnectXMatch(columns, rows, win_length, "X", "O", enable_log=False)
+    positions = []
+    seen = {root.canonical_key()[0]}
+    frontier = [root]
+    for ply in range(plies + 1):
+        positions.extend(frontier)
+        if ply == plies:
+            break
+        next_frontier = []
+        for match in frontier:
+            for column in match.getPossibleActions():
+                child = match.copy()
+                child.play_with_next_player(column)
+                canonical_key, _ = child.canonical_key()
+                if child.game_state == GameState.IN_PROGRESS and canonical_key not in seen:
+                    seen.add(canonical_key)
+                    next_frontier.append(child)
+        frontier = next_frontier
+    return positions
+
+
+def build_opening_book(
+    columns: int,
+    rows: int,
+    win_length: int,
+    plies: int,
+    time_limit_s: float = 1.0,
+    table_size: int = 1 << 20,
+    progress_callback: Callable[[int, int], None] = None
+) -> np.ndarray:
+    """
+    Search every position of the first plies and return the book records sorted by hash.
+
+    Args:
+        columns (int): Number of columns.
+        rows (int): Number of rows.
+        win_length (int): Number of pieces in a row needed to win.
+        plies (int): Depth of the book in moves.
+        time_limit_s (float): Search time per position. None solves every position exactly, which is only practical on small boards.
+        table_size (int): Number of transposition table slots, the table is shared by all the searches.
+        progress_callback (Callable[[int, int], None]): Called with the number of positions done and the total.
+
+    Returns:
+        np.ndarray: Records of dtype BOOK_DTYPE.
+    """
+    positions = enumerate_positions(columns, rows, win_length, plies)
+    records = np.zeros(len(positions), dtype=BOOK_DTYPE)
+    solver = Solver(table_size)
+    # Deepest positions first, so that their table entries help the shallower searches
+    for done, match in enumerate(reversed(positions)):
+        move = solver.search(match, time_limit_s=time_limit_s)
+        canonical_key, flipped = match.canonical_key()
+        records[done] = (
+            canonical_key,
+            match.mirror_move(move) if flipped else move,
+            SOLVED_DEPTH if solver.last_exact else solver.last_depth,
+            solver.last_score if solver.last_score is not None else 0
+        )
+        if progress_callback is not None:
+            progress_callback(done + 1, len(positions))
+    records.sort(order="hash")
+    return records
+
+
+def write_opening_book(file_path: str, records: np.ndarray, columns: int, rows: int, win_length: int, plies: int) -> None:
+    with open(file_path, "wb") as file:
+        file.write(BOOK_HEADER.pack(BOOK_MAGIC, columns, rows, win_length, plies, len(records)))
+        file.write(np.sort(records.astype(BOOK_DTYPE), order="hash").tobytes())
+
+
+class OpeningBook:
+    """
+    Read-only view of an opening book file. The records are memory-mapped, not loaded.
+    A pickled book only carries its path, so it can be handed to pool workers.
+    """
+    def __init__(self, file_path: str):
+        self.file_path: str = file_path
+        with open(file_path, "rb") as file:
+            magic, columns, rows, win_length, plies, count = BOOK_HEADER.unpack(file.read(BOOK_HEADER.size))
+        if magic != BOOK_MAGIC:
+            raise Exception(f"Error, {file_path} is not an opening book.")
+        self.COLUMNS: int = columns
+        self.ROWS: int = rows
+        self.WIN_LENGTH: int = win_length
+        self.PLIES: int = plies
+        if count == 0:
+            self.records: np.ndarray = np.zeros(0, dtype=BOOK_DTYPE)
+        else:
+            self.records: np.ndarray = np.memmap(file_path, dtype=BOOK_DTYPE, mode="r", offset=BOOK_HEADER.size, shape=(count,))
+        self._hashes: np.ndarray = self.records["hash"]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getstate__(self):
+        return {"file_path": self.file_path}
+
+    def __setstate__(self, state):
+        self.__init__(state["file_path"])
+
+    def lookup_key(self, canonical_key: int) -> Optional[Tuple[int, int, bool]]:
+        """
+        Returns:
+            Optional[Tuple[int, int, bool]]: The best move in the frame of the canonical key, its value for the player to
+            move as scored by the Solver, and whether the value is exact. None if the position is not in the book.
+        """
+        index = int(np.searchsorted(self._hashes, np.uint64(canonical_key)))
+        if index == len(self.records) or int(self._hashes[index]) != canonical_key:
+            return None
+        record = self.records[index]
+        return int(record["move"]), int(record["value"]), int(record["depth"]) == SOLVED_DEPTH
+
+    def lookup(self, match: ConnectXMatch) -> Optional[Tuple[int, int, bool]]:
+        """ Look up a match position, see lookup_key. The move is in the frame of the match. """
+        if (
+            (match.COLUMNS, match.ROWS, match.WIN_LENGTH) != (self.COLUMNS, self.ROWS, self.WIN_LENGTH) or
+            match.move_count > self.PLIES or
+            match.game_state != GameState.IN_PROGRESS
+        ):
+            return None
+        canonical_key, flipped = match.canonical_key()
+        entry = self.lookup_key(canonical_key)
+        if entry is not None and flipped:
+            return match.mirror_move(entry[0]), entry[1], entry[2]
+        return entry
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a Connect X opening book.")
+    parser.add_argument("--columns", type=int, default=7)
+    parser.add_argument("--rows", type=int, default=6)
+    parser.add_argument("--win-length", type=int, default=4)
+    parser.add_argument("--plies", type=int, default=4)
+    parser.add_argument("--time-limit", type=float, default=1.0, help="Search time per position in seconds, 0 to solve exactly.")
+    parser.add_argument("--output", type=str, required=True)
+    arguments = parser.parse_args()
+
+    start = time.perf_counter()
+
+    def print_progress(done: int, total: int) -> None:
+        if done % 100 == 0 or done == total:
+            print(f"{done}/{total} positions, {time.perf_counter() - start:.0f}s")
+
+    book_records = build_opening_book(
+        arguments.columns, arguments.rows, arguments.win_length, arguments.plies,
+        arguments.time_limit or None, progress_callback=print_progress
+    )
+    write_opening_book(arguments.output, book_records, arguments.columns, arguments.rows, arguments.win_length, arguments.plies)
+    print(f"Wrote {len(book_records)} positions to {arguments.output}")
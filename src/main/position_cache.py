@@ -0,0 +1,109 @@
+"""
+Disk-backed cache of proven position values, shared by processes and kept across runs.
+
+The file is a sequence of fixed-size records that are only ever appended, each with a single write
+on a file opened in append mode, so concurrent writers never interleave their records.
+Every reader keeps an in-memory index of the file, built when the cache is opened and extended with
+the records appended by other processes when a lookup misses.
+"""
+import os
+import struct
+from typing import Dict, Optional, Tuple
+
+from src.main.connect import ConnectXMatch
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+# Columns, rows, win length, canonical position key, value, best move
+CACHE_RECORD: struct.Struct = struct.Struct("<3HQqh")
+
+
+class PositionCache:
+    """
+    Proven values of positions, keyed by geometry and canonical position key, so a position and its
+    mirror image share a record. Values are Solver scores for the player to move, and best moves
+    are stored in the frame of the canonical key. A pickled cache only carries its path, so it
+    can be handed to pool workers, which reopen the file.
+    """
+    def __init__(self, file_path: str):
+        self.file_path: str = file_path
+        self._file_descriptor: int = os.open(file_path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        self._reader = open(file_path, "rb")
+        # Size of the part of the file already in the index
+        self._offset: int = 0
+        self._index: Dict[Tuple[int, int, int, int], Tuple[int, int]] = {}
+        self.refresh()
+
+    @staticmethod
+    def _key(match: ConnectXMatch) -> Tuple[Tuple[int, int, int, int], bool]:
+        canonical_key, flipped = match.canonical_key()
+        return (match.COLUMNS, match.ROWS, match.WIN_LENGTH, canonical_key), flipped
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, match: ConnectXMatch) -> bool:
+        return self.get(match) is not None
+
+    def __getstate__(self):
+        return {"file_path": self.file_path}
+
+    def __setstate__(self, state):
+        self.__init__(state["file_path"])
+
+    def refresh(self) -> int:
+        """
+        Read the records appended since the last refresh, by this process or by others.
+        A record that is still being written is left for the next refresh.
+
+        Returns:
+            int: The number of records read.
+        """
+        if os.fstat(self._file_descriptor).st_size == self._offset:
+            return 0
+        self._reader.seek(self._offset)
+        data = self._reader.read()
+        complete_size = len(data) - len(data) % CACHE_RECORD.size
+        for columns, rows, win_length, key, value, move in CACHE_RECORD.iter_unpack(data[:complete_size]):
+            # The first record of a position wins, as in put
+            self._index.setdefault((columns, rows, win_length, key), (value, move))
+        self._offset += complete_size
+        return complete_size // CACHE_RECORD.size
+
+    def get(self, match: ConnectXMatch) -> Optional[Tuple[int, int]]:
+        """
+        Returns:
+            Optional[Tuple[int, int]]: The value of the match position and its best move, None if it has not been proven yet.
+        """
+        key, flipped = self._key(match)
+        entry = self._index.get(key)
+        if entry is None and self.refresh():
+            entry = self._index.get(key)
+        if entry is not None and flipped:
+            return entry[0], match.mirror_move(entry[1])
+        return entry
+
+    def put(self, match: ConnectXMatch, value: int, move: int) -> None:
+        """ Store the proven value and best move of the match position, unless it is already known. """
+        key, flipped = self._key(match)
+        if key in self._index:
+            return
+        if flipped:
+            move = match.mirror_move(move)
+        self._index[key] = (value, move)
+        record = CACHE_RECORD.pack(*key, value, move)
+        if fcntl is not None:
+            fcntl.flock(self._file_descriptor, fcntl.LOCK_EX)
+        try:
+            os.write(self._file_descriptor, record)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(self._file_descriptor, fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        os.close(self._file_descriptor)
+        self._reader.close()
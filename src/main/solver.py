@@ -0,0 +1,447 @@
+import time
+from array import array
+from typing import List, Tuple
+
+from src.main.connect import Agent, ConnectXMatch, GameState, NumericObservation, get_line_index, get_zobrist_table, numeric_observation
+
+
+# A win is worth WIN_SCORE plus the number of empty cells left after the winning move
+WIN_SCORE: int = 1 << 40
+INFINITY: int = 1 << 50
+
+# Transposition table entry flags, 0 marks an empty slot
+EXACT: int = 1
+LOWER_BOUND: int = 2
+UPPER_BOUND: int = 3
+# Depth stored for entries whose subtree was searched to the end of the game
+SOLVED_DEPTH: int = 0x7FFF
+# Default share of a timed search spent on proving the result before the depth-limited iterations
+PROOF_SHARE: float = 0.75
+
+
+class _SearchTimeout(Exception):
+    pass
+
+
+class Solver:
+    """
+    Negamax search with alpha-beta pruning over the bitboards of a ConnectXMatch.
+
+    Scores are from the point of view of the player to move: a win scores WIN_SCORE plus the number
+    of cells still empty after the winning move, so faster wins score higher, a draw scores 0, and
+    positions at the depth limit get a heuristic score far below WIN_SCORE.
+    Iterative deepening stops as soon as an iteration never reaches the depth limit, which means the
+    score is exact. With a time limit and no maximum depth, a search to the end of the game with a
+    window around the draw score first tries to prove the result, see search.
+    Wins and threats are found with bitmasks of the cells that complete a line, moves making the most
+    new threats are searched first, and the heuristic score is kept up to date move by move.
+    The transposition table has a fixed number of slots indexed by the canonical key of the position,
+    so a position and its mirror image share an entry, and a new entry replaces the old entry of its slot.
+    With a PositionCache, searched positions that are already proven are answered from the cache,
+    and positions solved exactly are added to it.
+    """
+    def __init__(self, table_size: int = 1 << 20, position_cache = None, proof_share: float = PROOF_SHARE):
+        self.table_size: int = table_size
+        self.position_cache = position_cache
+        self.proof_share: float = proof_share
+        self._geometry: Tuple[int, int, int] = None
+
+        # Statistics of the last search
+        self.nodes: int = 0
+        self.last_depth: int = 0
+        self.last_score: int = None
+        self.last_exact: bool = False
+        # Whether the result, win, draw or loss, is proven. The score of a proven win or loss may only be a bound.
+        self.last_proven: bool = False
+
+    def clear(self) -> None:
+        """ Empty the transposition table. """
+        self.table_keys: array = array('Q', [0]) * self.table_size
+        self.table_values: array = array('q', [0]) * self.table_size
+        self.table_depths: array = array('h', [0]) * self.table_size
+        self.table_flags: array = array('b', [0]) * self.table_size
+        self.table_moves: array = array('h', [-1]) * self.table_size
+
+    def _prepare(self, match: ConnectXMatch) -> None:
+        geometry = (match.COLUMNS, match.ROWS, match.WIN_LENGTH)
+        if geometry != self._geometry:
+            # The table is only allocated when the first position is searched, and entries of another geometry are meaningless
+            self._geometry = geometry
+            self.COLUMNS, self.ROWS, self.WIN_LENGTH = geometry
+            self._column_bits: int = self.ROWS + 1
+            self._size: int = self.COLUMNS * self.ROWS
+            line_index = get_line_index(*geometry)
+            self._line_bitmasks: List[int] = line_index.line_bitmasks
+            # Line numbers of the lines through every bitboard position, empty for the sentinel positions
+            self._position_lines: List[List[int]] = [[] for _ in range(self.COLUMNS * self._column_bits)]
+            for cell, line_numbers in enumerate(line_index.cell_lines):
+                self._position_lines[(cell // self.ROWS) * self._column_bits + cell % self.ROWS] = line_numbers
+            # Bitmasks of the cells of the board, of the bottom cell of every column and of every column
+            self._board_mask: int = sum(((1 << self.ROWS) - 1) << (column * self._column_bits) for column in range(self.COLUMNS))
+            self._bottom_mask: int = sum(1 << (column * self._column_bits) for column in range(self.COLUMNS))
+            self._column_masks: List[int] = [((1 << self.ROWS) - 1) << (column * self._column_bits) for column in range(self.COLUMNS)]
+            # Bitboard shifts of 1 to WIN_LENGTH - 1 steps up a column, and along a row and both diagonals
+            self._vertical_shifts: List[int] = list(range(1, self.WIN_LENGTH))
+            self._line_shifts: List[List[int]] = [
+                [step * steps for steps in range(1, self.WIN_LENGTH)] for step in [self._column_bits, self._column_bits + 1, self._column_bits - 1]
+            ]
+            self._zobrist_table: Tuple[List[int], List[int]] = get_zobrist_table(self.COLUMNS, self.ROWS)
+            # Bitboard position of the mirror image of every position
+            self._mirror_positions: List[int] = [
+                (self.COLUMNS - 1 - position // self._column_bits) * self._column_bits + position % self._column_bits
+                for position in range(self.COLUMNS * self._column_bits)
+            ]
+            # Centre columns first
+            self._order: List[int] = sorted(range(self.COLUMNS), key=lambda column: abs(2 * column - self.COLUMNS + 1))
+            # Heuristic weight of a line holding k pieces of one player and none of the other
+            self._weights: List[int] = [0] + [4 ** (pieces - 1) for pieces in range(1, self.WIN_LENGTH + 1)]
+            self.clear()
+        self._move_count: int = match.move_count
+        # Pieces of each player on every line, and the heuristic score for the first player
+        self._line_counts: List[List[int]] = [
+            [bin(line & bitboard).count("1") for line in self._line_bitmasks] for bitboard in match._bitboards
+        ]
+        self._evaluation: int = 0
+        for first_pieces, second_pieces in zip(*self._line_counts):
+            if not second_pieces:
+                self._evaluation += self._weights[first_pieces]
+            elif not first_pieces:
+                self._evaluation -= self._weights[second_pieces]
+        self._evaluating: bool = False
+
+    def _winning_cells(self, bitboard: int) -> int:
+        """
+        Bitmask of the cells, filled or not, that complete a line of the player with the given pieces.
+        A cell completes a line if some direction has a pieces of the player right before it and WIN_LENGTH - 1 - a
+        right after it. Runs cannot wrap around between columns, which would cross the always empty sentinel row.
+        """
+        length = self.WIN_LENGTH - 1
+        # Vertically, only the pieces below a cell count
+        cells = ~0
+        for shift in self._vertical_shifts:
+            cells &= bitboard << shift
+        for shifts in self._line_shifts:
+            # before[a] has the cells with a pieces right before them
+            before = [~0]
+            run = ~0
+            for shift in shifts:
+                run &= bitboard << shift
+                before.append(run)
+            cells |= run
+            after = ~0
+            pieces_before = length
+            for shift in shifts:
+                after &= bitboard >> shift
+                if not after:
+                    break
+                pieces_before -= 1
+                cells |= before[pieces_before] & after
+        return cells & self._board_mask
+
+    def _add_piece(self, position: int, player_index: int) -> None:
+        """ Update the line counts and the heuristic score for a new piece. Restore the score after _remove_piece. """
+        own_counts = self._line_counts[player_index]
+        other_counts = self._line_counts[1 - player_index]
+        weights = self._weights
+        change = 0
+        for line in self._position_lines[position]:
+            pieces = own_counts[line]
+            if not other_counts[line]:
+                change += weights[pieces + 1] - weights[pieces]
+            elif not pieces:
+                # The line no longer counts for the other player
+                change += weights[other_counts[line]]
+            own_counts[line] = pieces + 1
+        self._evaluation += -change if player_index else change
+
+    def _remove_piece(self, position: int, player_index: int) -> None:
+        own_counts = self._line_counts[player_index]
+        for line in self._position_lines[position]:
+            own_counts[line] -= 1
+
+    def _negamax(
+        self, current: int, opponent: int, current_wins: int, opponent_wins: int, player_index: int,
+        zobrist_hash: int, mirror_hash: int, depth: int, alpha: int, beta: int
+    ) -> int:
+        """ current_wins and opponent_wins are the _winning_cells of current and opponent. """
+        self.nodes += 1
+        if self.nodes & 63 == 0 and self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise _SearchTimeout()
+        move_count = self._move_count
+        mask = current | opponent
+        # The lowest empty cell of every column that is not full
+        possible = (mask + self._bottom_mask) & self._board_mask
+
+        # Win now if possible, and block the cell where the opponent would win
+        if current_wins & possible:
+            return WIN_SCORE + self._size - move_count - 1
+        opponent_wins &= ~mask
+        forced = possible & opponent_wins
+        if forced:
+            if forced & (forced - 1):
+                # Only one of the threats can be blocked
+                return -(WIN_SCORE + self._size - move_count - 2)
+            possible = forced
+        if move_count + 1 == self._size:
+            return 0
+        # A piece right below a cell where the opponent wins lets them win there
+        possible &= ~(opponent_wins >> 1)
+        if not possible:
+            return -(WIN_SCORE + self._size - move_count - 2)
+        if depth == 0:
+            self._cutoffs += 1
+            return -self._evaluation if player_index else self._evaluation
+        # Neither player can win before the next move of the player to move, and the opponent cannot win right after it
+        beta = min(beta, WIN_SCORE + self._size - move_count - 3)
+        alpha = max(alpha, -(WIN_SCORE + self._size - move_count - 4))
+        if alpha >= beta:
+            return beta
+
+        cutoffs_before = self._cutoffs
+        # Table moves are stored in the frame of the canonical key
+        flipped = mirror_hash < zobrist_hash
+        key = mirror_hash if flipped else zobrist_hash
+        slot = key % self.table_size
+        table_move = -1
+        if self.table_flags[slot] and self.table_keys[slot] == key:
+            table_move = self.table_moves[slot]
+            if flipped:
+                table_move = self.COLUMNS - 1 - table_move
+            if self.table_depths[slot] >= depth:
+                if self.table_depths[slot] != SOLVED_DEPTH:
+                    self._cutoffs += 1
+                flag = self.table_flags[slot]
+                value = self.table_values[slot]
+                if flag == EXACT:
+                    return value
+                if flag == LOWER_BOUND:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        # The table move first, then the moves making the most new winning cells, then centre columns first
+        moves = []
+        for column in self._order:
+            move = possible & self._column_masks[column]
+            if move:
+                new_wins = self._winning_cells(current | move)
+                moves.append((-INFINITY if column == table_move else -bin(new_wins & ~(mask | move)).count("1"), column, move, new_wins))
+        moves.sort(key=lambda move: move[0])
+
+        alpha_original = alpha
+        best_score = -INFINITY
+        best_move = moves[0][1]
+        next_zobrist_table = self._zobrist_table[player_index]
+        evaluating = self._evaluating
+        evaluation = self._evaluation
+        for _, column, move, new_wins in moves:
+            position = move.bit_length() - 1
+            if evaluating:
+                self._add_piece(position, player_index)
+            self._move_count += 1
+            score = -self._negamax(
+                opponent, current | move, opponent_wins, new_wins, 1 - player_index,
+                zobrist_hash ^ next_zobrist_table[position], mirror_hash ^ next_zobrist_table[self._mirror_positions[position]],
+                depth - 1, -beta, -alpha
+            )
+            self._move_count -= 1
+            if evaluating:
+                self._remove_piece(position, player_index)
+                self._evaluation = evaluation
+            if score > best_score:
+                best_score = score
+                best_move = column
+            if score > alpha:
+                alpha = score
+                if alpha >= beta:
+                    break
+
+        self.table_keys[slot] = key
+        self.table_values[slot] = best_score
+        self.table_depths[slot] = SOLVED_DEPTH if self._cutoffs == cutoffs_before else depth
+        self.table_moves[slot] = self.COLUMNS - 1 - best_move if flipped else best_move
+        if best_score <= alpha_original:
+            self.table_flags[slot] = UPPER_BOUND
+        elif best_score >= beta:
+            self.table_flags[slot] = LOWER_BOUND
+        else:
+            self.table_flags[slot] = EXACT
+        return best_score
+
+    def _search_root(
+        self, current: int, opponent: int, player_index: int, zobrist_hash: int, mirror_hash: int, depth: int, moves: List[int],
+        alpha: int = -INFINITY, beta: int = INFINITY
+    ) -> Tuple[int, int]:
+        mask = current | opponent
+        possible = (mask + self._bottom_mask) & self._board_mask
+        current_wins = self._winning_cells(current)
+        opponent_wins = self._winning_cells(opponent)
+        for column in moves:
+            if current_wins & possible & self._column_masks[column]:
+                return column, WIN_SCORE + self._size - self._move_count - 1
+        # The search may stop at any depth
+        self._evaluating = depth < self._size - self._move_count
+        best_column = moves[0]
+        best_score = -INFINITY
+        for column in moves:
+            move = possible & self._column_masks[column]
+            position = move.bit_length() - 1
+            evaluation = self._evaluation
+            if self._evaluating:
+                self._add_piece(position, player_index)
+            self._move_count += 1
+            score = -self._negamax(
+                opponent, current | move, opponent_wins, self._winning_cells(current | move), 1 - player_index,
+                zobrist_hash ^ self._zobrist_table[player_index][position],
+                mirror_hash ^ self._zobrist_table[player_index][self._mirror_positions[position]],
+                depth - 1, -beta, -alpha
+            )
+            self._move_count -= 1
+            if self._evaluating:
+                self._remove_piece(position, player_index)
+                self._evaluation = evaluation
+            if score > best_score:
+                best_score = score
+                best_column = column
+            if score > alpha:
+                alpha = score
+                if alpha >= beta:
+                    break
+        return best_column, best_score
+
+    def search(self, match: ConnectXMatch, time_limit_s: float = None, max_depth: int = None) -> int:
+        """
+        Search the match position with iterative deepening.
+        Without a time limit or a maximum depth, the position is solved exactly in a single full-depth search.
+        With a time limit and no maximum depth, the search first spends up to proof_share of the time on proving
+        whether the position is a win, a draw or a loss. A proven result ends the search, its best move keeps it,
+        and the depth-limited iterations use the rest of the time otherwise.
+
+        Args:
+            match (ConnectXMatch): The position to search, with the searching player to move.
+            time_limit_s (float): Time budget of the search in seconds. The best move of the last finished iteration is returned.
+            max_depth (int): Maximum search depth in moves.
+
+        Returns:
+            int: The best column, or None if the game is over.
+        """
+        if match.game_state != GameState.IN_PROGRESS:
+            return None
+        if self.position_cache is not None:
+            cached = self.position_cache.get(match)
+            if cached is not None:
+                self.nodes = 0
+                self.last_depth = 0
+                self.last_score, best_column = cached
+                self.last_exact = True
+                self.last_proven = True
+                return best_column
+        start = time.perf_counter()
+        self._prepare(match)
+        player_index = self._move_count % 2
+        current = match._bitboards[player_index]
+        opponent = match._bitboards[1 - player_index]
+
+        moves = [column for column in self._order if match.column_heights[column] < self.ROWS]
+        best_column = moves[0]
+        self.nodes = 0
+        self.last_depth = 0
+        self.last_score = None
+        self.last_exact = False
+        self.last_proven = False
+        remaining_moves = self._size - self._move_count
+        if time_limit_s is not None and max_depth is None and self.proof_share > 0:
+            self._deadline = start + time_limit_s * self.proof_share
+            self._cutoffs = 0
+            try:
+                # Scores strictly between -1 and 1 are draws, the others only need to be on the right side
+                column, score = self._search_root(
+                    current, opponent, player_index, match.zobrist_hash, match._mirror_hash, remaining_moves, moves, -1, 1
+                )
+            except _SearchTimeout:
+                # The interrupted search left its counters behind
+                self._prepare(match)
+            else:
+                self.last_depth = remaining_moves
+                self.last_score = score
+                # Other than draws, only an immediate win, the highest possible score, is known exactly
+                self.last_exact = score == 0 or score == WIN_SCORE + self._size - self._move_count - 1
+                self.last_proven = True
+                if self.last_exact and self.position_cache is not None:
+                    self.position_cache.put(match, score, column)
+                return column
+        self._deadline = start + time_limit_s if time_limit_s is not None else None
+        if time_limit_s is None and max_depth is None:
+            # Shallower iterations would not save any work
+            depths = [remaining_moves]
+        else:
+            depths = range(1, min(remaining_moves, max_depth or remaining_moves) + 1)
+        for depth in depths:
+            self._cutoffs = 0
+            try:
+                column, score = self._search_root(current, opponent, player_index, match.zobrist_hash, match._mirror_hash, depth, moves)
+            except _SearchTimeout:
+                break
+            best_column = column
+            self.last_depth = depth
+            self.last_score = score
+            self.last_exact = self._cutoffs == 0 or abs(score) >= WIN_SCORE
+            self.last_proven = self.last_exact
+            if self._cutoffs == 0 and self.position_cache is not None:
+                # Only values that do not depend on the depth limit anywhere are stored
+                self.position_cache.put(match, score, column)
+            if self.last_exact:
+                break
+            # Search the best move first in the next iteration
+            moves.remove(column)
+            moves.insert(0, column)
+        return best_column
+
+    def solve(self, match: ConnectXMatch) -> int:
+        """
+        Exact score of the match position for the player to move: positive if they win, 0 for a draw, negative if they lose.
+        """
+        if match.game_state == GameState.DRAW:
+            return 0
+        if match.game_state != GameState.IN_PROGRESS:
+            return -(WIN_SCORE + match.COLUMNS * match.ROWS - match.move_count)
+        self.search(match)
+        return self.last_score
+
+
+class SolverAgent:
+    """
+    Agent playing the move of a depth-first alpha-beta search, keeping its transposition table between moves.
+    Use the play method as the agent function, with a time limit below the time limit of the match.
+    Positions found in the opening book, an OpeningBook of the geometry, are answered without searching,
+    and an optional PositionCache is shared with other agents and runs, see Solver.
+    """
+    def __init__(
+        self,
+        name: str,
+        time_limit_s: float = 1.0,
+        table_size: int = 1 << 20,
+        opening_book = None,
+        position_cache = None
+    ):
+        self.name: str = name
+        self.time_limit_s: float = time_limit_s
+        self.solver: Solver = Solver(table_size, position_cache)
+        self.opening_book = opening_book
+
+    @numeric_observation
+    def play(self, board, win_length: int, opponent_name: str) -> int:
+        if isinstance(board, NumericObservation):
+            match: ConnectXMatch = ConnectXMatch.from_observation(board, win_length, self.name, opponent_name)
+        else:
+            match: ConnectXMatch = ConnectXMatch.from_board(board, win_length, self.name, opponent_name)
+        if self.opening_book is not None:
+            book_entry = self.opening_book.lookup(match)
+            if book_entry is not None:
+                return book_entry[0]
+        return self.solver.search(match, time_limit_s=self.time_limit_s)
+
+    def as_agent(self) -> Agent:
+        return Agent(self.name, self.play)
@@ -0,0 +1,139 @@
+import os
+import random
+import time
+
+from src.main.agent_process import WALL_TIME_FACTOR, AgentProcess, get_agent_process
+from src.main.connect import BoardDimension, Agent, ConnectXMatch, ConnectXMatchWithAgents, GameState, Matchup
+
+
+def first_free_column_agent(board, win_length, opponent_name):
+    for column in range(board.shape[0]):
+        if board[column][-1] is None:
+            return column
+
+
+def busy_agent(board, win_length, opponent_name):
+    while True:
+        pass
+
+
+def sleepy_agent(board, win_length, opponent_name):
+    time.sleep(0.3)
+    return 0
+
+
+def error_agent(board, win_length, opponent_name):
+    raise ValueError("no move")
+
+
+def pid_agent(board, win_length, opponent_name):
+    return os.getpid()
+
+
+def random_number_agent(board, win_length, opponent_name):
+    return random.random()
+
+
+class PickleCountingAgent:
+    pickles = 0
+
+    def __getstate__(self):
+        PickleCountingAgent.pickles += 1
+        return self.__dict__
+
+    def play(self, board, win_length, opponent_name):
+        return first_free_column_agent(board, win_length, opponent_name)
+
+
+class TestAgentProcess:
+    def test_play(self):
+        board = ConnectXMatch(7, 6, 4, "X", "O").get_board_copy()
+        agent_process = AgentProcess(first_free_column_agent)
+        assert agent_process.play(board, 4, "O", 1.0) == (AgentProcess.OK, 0)
+        assert agent_process.last_cpu_time < 1.0
+        assert agent_process.play(board, 4, "O", 1.0) == (AgentProcess.OK, 0)
+        assert agent_process.restarts == 0
+        agent_process.stop()
+
+        assert AgentProcess(error_agent).play(board, 4, "O", 1.0) == (AgentProcess.ERROR, "no move")
+
+    def test_seed(self):
+        board = ConnectXMatch(7, 6, 4, "X", "O").get_board_copy()
+        agent_process = AgentProcess(random_number_agent)
+        agent_process.seed(5)
+        _, first_number = agent_process.play(board, 4, "O", 1.0)
+        agent_process.seed(5)
+        assert agent_process.play(board, 4, "O", 1.0) == (AgentProcess.OK, first_number)
+        random.seed(5)
+        assert first_number == random.random()
+        agent_process.stop()
+
+    def test_timeout_kills_and_restarts(self):
+        board = ConnectXMatch(7, 6, 4, "X", "O").get_board_copy()
+        agent_process = AgentProcess(busy_agent)
+        agent_process.start()
+        pid = agent_process._process.pid
+        assert agent_process.play(board, 4, "O", 0.2) == (AgentProcess.TIMEOUT, None)
+        assert agent_process.restarts == 1
+        assert agent_process.is_alive()
+        assert agent_process._process.pid != pid
+        agent_process.stop()
+
+    def test_time_limit_applies_to_cpu_time(self):
+        # Sleeping does not use CPU time, so the move counts as long as it arrives within the wall time allowance
+        board = ConnectXMatch(7, 6, 4, "X", "O").get_board_copy()
+        agent_process = AgentProcess(sleepy_agent, wall_time_factor=3.0)
+        assert agent_process.play(board, 4, "O", 0.2) == (AgentProcess.OK, 0)
+        agent_process.stop()
+
+    def test_wall_time_limit(self):
+        # A sleeping agent uses no CPU time, but the wall-clock rule still times it out
+        board = ConnectXMatch(7, 6, 4, "X", "O").get_board_copy()
+        agent_process = AgentProcess(sleepy_agent)
+        assert agent_process.play(board, 4, "O", 0.3 / (WALL_TIME_FACTOR * 2)) == (AgentProcess.TIMEOUT, None)
+        assert agent_process.restarts == 1
+        agent_process.stop()
+
+    def test_warm_process_is_reused(self):
+        board = ConnectXMatch(7, 6, 4, "X", "O").get_board_copy()
+        agent_process = get_agent_process("pid", pid_agent)
+        assert get_agent_process("pid", pid_agent) is agent_process
+        status, first_pid = agent_process.play(board, 4, "O", 1.0)
+        assert status == AgentProcess.OK and first_pid != os.getpid()
+        assert get_agent_process("pid", pid_agent).play(board, 4, "O", 1.0) == (AgentProcess.OK, first_pid)
+
+    def test_agent_is_only_pickled_to_start_its_process(self):
+        board = ConnectXMatch(7, 6, 4, "X", "O").get_board_copy()
+        agent = PickleCountingAgent()
+        agent_process = get_agent_process("counting", agent.play)
+        assert agent_process.play(board, 4, "O", 1.0) == (AgentProcess.OK, 0)
+        pickles = PickleCountingAgent.pickles
+        # Another bound method of the same object finds the same process
+        for _ in range(3):
+            assert get_agent_process("counting", agent.play) is agent_process
+        assert PickleCountingAgent.pickles == pickles
+        # Another agent with the same name replaces it
+        other_agent_process = get_agent_process("counting", PickleCountingAgent().play)
+        assert other_agent_process is not agent_process
+        assert not agent_process.is_alive()
+        other_agent_process.stop()
+
+
+class TestProcessIsolatedGames:
+    def test_full_game(self):
+        match = ConnectXMatchWithAgents(7, 6, 4, "first", "busy", first_free_column_agent, busy_agent, 0.2, enable_process_isolation=True)
+        assert match.play_full_game() == "first"
+        assert match.game.game_state == GameState.TIME_LIMIT_EXCEEDED
+        assert "Player busy exceeded the time limit and lost." in match.game.log
+
+        match = ConnectXMatchWithAgents(7, 6, 4, "error", "first", error_agent, first_free_column_agent, 1.0, enable_process_isolation=True)
+        assert match.play_full_game() == "first"
+        assert match.game.game_state == GameState.AGENT_ERROR
+
+    def test_parallel_matchup(self):
+        matchup = Matchup(
+            BoardDimension(7, 6), 4, Agent("first", first_free_column_agent), Agent("busy", busy_agent), 0.2, 10,
+            enable_process_isolation=True
+        )
+        matchup.play_n_games_with_parallelism(2, num_processes=2)
+        assert matchup.first_player_wins == 2
@@ -1,19 +1,35 @@
 import unittest
+import asyncio
 import pytest
 import random
 import os
+import time
 import copy
+import pickle
+import json
 import numpy as np
 
 from src.main.connect import (
     GameState, 
     ConnectXMatch, 
+    BatchConnectX,
+    LineIndex,
+    get_line_index,
+    mirror_column,
+    canonical_board,
+    NumericObservation,
+    numeric_observation,
     ConnectXMatchWithAgents, 
     Matchup, 
     MetaMatchup, 
     ConnectXVisual, 
     BoardDimension, 
     Agent,
+    LatencyStats,
+    PairSequentialTest,
+    GameRecord,
+    GameExecutor,
+    GameCheckpoint,
     Tournament
 )
 
@@ -323,6 +339,297 @@ class TestConnectXMatch:
         copied_match.make_move(1, "Player2")
         assert original_match != copied_match
 
+    def test_no_win_across_columns(self):
+        # Top of column 0 and bottom of column 1 must not form a vertical line
+        game = ConnectXMatch(columns=3, rows=3, win_length=4, first_player_name="X", second_player_name="O")
+        for _ in range(3):
+            game.make_move(0, 'X')
+        game.make_move(1, 'X')
+        assert not game.check_win()
+        assert game.game_state == GameState.IN_PROGRESS
+
+        # A diagonal leaving the top of the board must not wrap into the next column
+        game = ConnectXMatch(columns=4, rows=2, win_length=3, first_player_name="X", second_player_name="O")
+        game.make_move(0, 'O')
+        game.make_move(0, 'X')
+        game.make_move(1, 'X')
+        game.make_move(2, 'X')
+        assert game.game_state == GameState.IN_PROGRESS
+
+    def test_large_board_win(self):
+        # Diagonal win on a large board with a long win length
+        game = ConnectXMatch(columns=30, rows=30, win_length=8, first_player_name="X", second_player_name="O")
+        for i in range(8):
+            for _ in range(i):
+                game.make_move(10 + i, 'O')
+            game.make_move(10 + i, 'X')
+        assert game.game_state == GameState.WIN
+        assert game.winner == 'X'
+
+    def test_last_move_win_matches_full_check(self):
+        # The incremental check in make_move must agree with a full-board check
+        rng = random.Random(0)
+        for columns, rows, win_length in [(7, 6, 4), (5, 4, 3), (9, 7, 5)]:
+            for _ in range(30):
+                game = ConnectXMatch(columns, rows, win_length, "X", "O")
+                while game.game_state == GameState.IN_PROGRESS:
+                    game.play_with_next_player(rng.choice(game.getPossibleActions()))
+                    assert (game.game_state == GameState.WIN) == game.check_win()
+
+    def test_column_heights_and_move_count(self, game: ConnectXMatch):
+        assert game.column_heights == [0] * 7
+        assert game.move_count == 0
+        game.play_with_next_player(3)
+        game.play_with_next_player(3)
+        game.play_with_next_player(0)
+        assert game.column_heights == [1, 0, 0, 2, 0, 0, 0]
+        assert game.move_count == 3
+        # Illegal moves do not add a piece
+        game.play_with_next_player(7)
+        assert game.move_count == 3
+        # Heights are rebuilt when a board is assigned
+        copied = ConnectXMatch(7, 6, 4, "X", "O")
+        copied.board = copy.deepcopy(game.board)
+        assert copied.column_heights == game.column_heights
+        assert copied.move_count == game.move_count
+
+    def test_board_assignment(self):
+        # Loading a string board, including an unknown name for the absent player
+        board = np.full((7, 6), None)
+        board[0][0] = "Agent"
+        board[1][0] = "O"
+        board[0][1] = "Agent"
+        game = ConnectXMatch(7, 6, 4, "X", "O")
+        game.board = board
+        assert game.board is board
+        game.make_move(0, "X")
+        assert board[0][2] == "X"
+        game.make_move(0, "X")
+        assert game.game_state == GameState.WIN
+        assert game.winner == "X"
+
+    def test_from_board(self):
+        game = ConnectXMatch(7, 6, 4, "O", "X")
+        game.play_with_next_player(3)
+        # The opponent has one more piece, so it played first
+        match = ConnectXMatch.from_board(game.get_board_copy(), 4, "X", "O")
+        assert match.FIRST_PLAYER_NAME == "O"
+        assert match.previous_player_who_played == "O"
+        assert match.game_state == GameState.IN_PROGRESS
+        match.play_with_next_player(3)
+        assert match.board[3][1] == "X"
+
+        # Same number of pieces, the agent played first
+        game.play_with_next_player(4)
+        match = ConnectXMatch.from_board(game.get_board_copy(), 4, "X", "O")
+        assert match.FIRST_PLAYER_NAME == "X"
+        assert match.previous_player_who_played == "O"
+
+        # Terminal positions are detected
+        for column in [3, 4, 3, 4, 3]:
+            game.play_with_next_player(column)
+        match = ConnectXMatch.from_board(game.get_board_copy(), 4, "X", "O")
+        assert match.game_state == GameState.WIN
+        assert match.winner == "O"
+
+    def test_pickle_drops_string_board(self):
+        match = ConnectXMatch(7, 6, 4, "Player1", "Player2")
+        match.make_move(0, "Player1")
+        match.make_move(1, "Player2")
+        # Materialise the string board, it must not travel with the pickle
+        assert match.board[1][0] == "Player2"
+        unpickled = pickle.loads(pickle.dumps(match))
+        assert unpickled._board is None
+        assert unpickled == match
+        assert np.array_equal(unpickled.board, match.board)
+        assert unpickled._cells.dtype == np.int8
+
+    def test_push_pop(self, game: ConnectXMatch):
+        game.play_with_next_player(0)
+        game.play_with_next_player(1)
+        original = game.copy()
+        original_log = list(game.log)
+        original_moves = list(game.moves_played)
+
+        # Nested pushes, including a winning move and an illegal move, are undone exactly
+        rng = random.Random(1)
+        for _ in range(20):
+            depth = 0
+            while game.game_state == GameState.IN_PROGRESS:
+                game.push(rng.randint(-1, game.COLUMNS))
+                depth += 1
+            for _ in range(depth):
+                game.pop()
+            assert game == original
+            assert game.column_heights == original.column_heights
+            assert game.move_count == original.move_count
+            assert game.log == original_log
+            assert game.moves_played == original_moves
+
+        # Context manager form
+        with game.try_move(2):
+            assert game.board[2][0] == 'X'
+            assert game.previous_player_who_played == 'X'
+        assert game.board[2][0] is None
+        assert game == original
+
+        # Pushing in a terminal state raises and leaves the match untouched
+        game.game_state = GameState.WIN
+        with pytest.raises(Exception):
+            game.push(0)
+        assert game.moves_played == original_moves
+
+    def test_log(self, game: ConnectXMatch):
+        for column in [0, 6, 1, 6, 2, 5, 3]:
+            game.play_with_next_player(column)
+        assert game.log[0] == "Player X played in column 0."
+        assert game.log[-1] == "Player X won the game."
+        assert len(game.log) == 7
+        assert all(isinstance(record, tuple) for record in game._log_records)
+
+        illegal_game = ConnectXMatch(7, 6, 4, "X", "O")
+        illegal_game.make_move(7, "X")
+        assert illegal_game.termination_message == "Played outside of the board."
+        assert illegal_game.log == ["Played outside of the board.", "Player X tried to play in full column 7 and lost."]
+
+        # Logging can be switched off, for instance for search copies
+        silent_game = ConnectXMatch(7, 6, 4, "X", "O", enable_log=False)
+        silent_game.play_with_next_player(0)
+        assert silent_game.log == []
+        search_copy = game.copy(enable_log=False)
+        assert search_copy.log == []
+        assert search_copy == game
+        assert game.copy().log == game.log
+        assert ConnectXMatch(7, 6, 4, "X", "O").takeAction(3).log == []
+
+    def test_canonical_key(self, game: ConnectXMatch):
+        mirrored_game = ConnectXMatch(7, 6, 4, "X", "O")
+        assert game.canonical_key() == (0, False)
+        for column in [0, 2, 2, 5]:
+            game.play_with_next_player(column)
+            mirrored_game.play_with_next_player(mirrored_game.mirror_move(column))
+        key, flipped = game.canonical_key()
+        mirrored_key, mirrored_flipped = mirrored_game.canonical_key()
+        assert key == mirrored_key
+        assert flipped != mirrored_flipped
+        assert key == min(game.zobrist_hash, mirrored_game.zobrist_hash)
+        assert mirror_column(0, 7) == 6
+        # The mirror hash follows pop and board assignment
+        mirrored_game.push(3)
+        mirrored_game.pop()
+        assert mirrored_game.canonical_key() == (mirrored_key, mirrored_flipped)
+        rebuilt_game = ConnectXMatch(7, 6, 4, "X", "O")
+        rebuilt_game.board = game.get_board_copy()
+        assert rebuilt_game.canonical_key() == (key, flipped)
+
+        board, board_flipped = canonical_board(game.get_board_copy())
+        mirrored_board, mirrored_board_flipped = canonical_board(mirrored_game.get_board_copy())
+        assert np.array_equal(board, mirrored_board)
+        assert board_flipped != mirrored_board_flipped
+        # Numeric boards are compared as they are
+        board, board_flipped = canonical_board(game.get_observation("X").board)
+        mirrored_board, mirrored_board_flipped = canonical_board(mirrored_game.get_observation("X").board)
+        assert np.array_equal(board, mirrored_board)
+        assert board_flipped != mirrored_board_flipped
+
+    def test_observation(self, game: ConnectXMatch):
+        game.play_with_next_player(3)
+        observation = game.get_observation("O")
+        assert observation.board.dtype == np.int8
+        assert not observation.board.flags.writeable
+        assert observation.board[3][0] == -1
+        with pytest.raises(ValueError):
+            observation.board[0][0] = 1
+        # The view follows the moves and undos of the match without being rebuilt
+        game.play_with_next_player(3)
+        assert observation.board[3][1] == 1
+        assert game.get_observation("X").board[3][1] == -1
+        game.push(0)
+        assert observation.board[0][0] == -1
+        game.pop()
+        assert observation.board[0][0] == 0
+        for _ in range(4):
+            game.play_with_next_player(6)
+        observation = game.get_observation("X")
+        assert observation.heights.tolist() == [0, 0, 0, 2, 0, 0, 4]
+        assert observation.legal_moves.all()
+        game.play_with_next_player(6)
+        game.play_with_next_player(6)
+        assert game.get_observation("X").legal_moves.tolist() == [True] * 6 + [False]
+        # A copy gets its own buffers
+        copied_game = game.copy()
+        copied_game.play_with_next_player(0)
+        assert observation.board[0][0] == 0
+
+        rebuilt_game = ConnectXMatch.from_observation(game.get_observation("X"), 4, "X", "O")
+        assert rebuilt_game.FIRST_PLAYER_NAME == "X"
+        assert np.array_equal(rebuilt_game.get_board_copy(), game.get_board_copy())
+        assert rebuilt_game.zobrist_hash == game.zobrist_hash
+        game.play_with_next_player(1)
+        rebuilt_game = ConnectXMatch.from_observation(game.get_observation("O"), 4, "O", "X")
+        assert rebuilt_game.FIRST_PLAYER_NAME == "X"
+        assert rebuilt_game.previous_player_who_played == "X"
+        assert np.array_equal(rebuilt_game.get_board_copy(), game.get_board_copy())
+
+    def test_zobrist_hash(self, game: ConnectXMatch):
+        assert game.zobrist_hash == 0
+        # Transpositions reach the same hash
+        other = ConnectXMatch(7, 6, 4, "X", "O")
+        for column in [0, 1, 2, 3]:
+            game.play_with_next_player(column)
+        for column in [2, 3, 0, 1]:
+            other.play_with_next_player(column)
+        assert game.zobrist_hash == other.zobrist_hash
+        assert hash(game) == hash(other)
+        assert len({game, other}) == 1
+
+        # Undo restores the hash, a different position changes it
+        hash_before = game.zobrist_hash
+        with game.try_move(4):
+            assert game.zobrist_hash != hash_before
+        assert game.zobrist_hash == hash_before
+
+        # Rebuilding from a board and unpickling keep the hash
+        rebuilt = ConnectXMatch(7, 6, 4, "X", "O")
+        rebuilt.board = game.get_board_copy()
+        assert rebuilt.zobrist_hash == hash_before
+        assert pickle.loads(pickle.dumps(game)).zobrist_hash == hash_before
+
+    def test_rollout(self, game: ConnectXMatch):
+        game.play_with_next_player(3)
+        original = game.copy()
+        # Seeded rollouts are reproducible and leave the match untouched
+        results = [game.rollout(rng=random.Random(seed)) for seed in range(50)]
+        assert results == [game.rollout(rng=random.Random(seed)) for seed in range(50)]
+        assert set(results) <= {-1, 0, 1}
+        assert game == original
+        assert game.move_count == 1
+
+        wins, draws, losses = game.rollouts(200, rng=random.Random(0))
+        assert wins + draws + losses == 200
+        # Counted for the player to move, "O", unless another player is given
+        assert game.rollouts(200, rng=random.Random(0), player="X") == (losses, draws, wins)
+
+        # The winning policy always takes an immediate win
+        game = ConnectXMatch(7, 6, 4, "X", "O")
+        for column in [0, 6, 1, 6, 2, 5]:
+            game.play_with_next_player(column)
+        assert game.rollouts(50, policy="winning") == (50, 0, 0)
+
+        # Terminal positions return their reward
+        game.play_with_next_player(3)
+        assert game.game_state == GameState.WIN
+        assert game.rollout() == 1
+
+        with pytest.raises(Exception):
+            game.rollout(policy="unknown")
+
+    def test_take_action(self, game: ConnectXMatch):
+        new_game = game.takeAction(3)
+        assert new_game.move_count == 1
+        assert new_game.board[3][0] == 'X'
+        assert game.move_count == 0
+
     def test_get_legal_actions(self, game: ConnectXMatch):
         game: ConnectXMatch = ConnectXMatch(columns=7, rows=1, win_length=4, first_player_name="X", second_player_name="O")
         # Initially, all columns should be legal actions
@@ -345,6 +652,80 @@ class TestConnectXMatch:
         game.make_move(6, 'X')
         assert game.getPossibleActions() == []
 
+class TestLineIndex:
+    def test_lines(self):
+        line_index = get_line_index(7, 6, 4)
+        assert isinstance(line_index, LineIndex)
+        # Built once per geometry
+        assert get_line_index(7, 6, 4) is line_index
+        assert get_line_index(7, 6, 5) is not line_index
+        # 24 horizontal, 21 vertical and 12 in each diagonal direction
+        assert line_index.number_of_lines == 69
+        assert line_index.line_cells.shape == (69, 4)
+        # The corner is on one line in each of three directions, a center cell on 13 lines
+        assert len(line_index.cell_lines[0]) == 3
+        assert len(line_index.cell_lines[3 * 6 + 2]) == 13
+        for cell, line_numbers in enumerate(line_index.cell_lines):
+            assert all(cell in line_index.line_cells[line_number] for line_number in line_numbers)
+            assert sorted(line_index.cell_lines_table[cell][line_index.cell_lines_table[cell] >= 0]) == sorted(line_numbers)
+
+    def test_lookups(self, game: ConnectXMatch):
+        line_index = game.line_index
+        for column in [0, 6, 1, 6, 2]:
+            game.play_with_next_player(column)
+        first_counts, second_counts = line_index.line_counts(game._cells)
+        assert first_counts.max() == 3
+        assert second_counts.max() == 2
+        winning_cells = line_index.winning_cells(game._cells, 1)
+        assert list(zip(*np.nonzero(winning_cells))) == [(3, 0)]
+        assert not line_index.winning_cells(game._cells, 2).any()
+        assert not line_index.is_win_through(game._cells, 2, 0)
+        game.play_with_next_player(5)
+        game.play_with_next_player(3)
+        assert line_index.is_win_through(game._cells, 0, 0)
+        assert not line_index.is_win_through(game._cells, 6, 0)
+        assert not line_index.is_win_through(game._cells, 4, 0)
+
+
+class TestBatchConnectX:
+    def test_step_matches_connect_x_match(self):
+        # Random columns, including illegal ones, must give the same results as ConnectXMatch
+        rng = np.random.default_rng(0)
+        for columns, rows, win_length in [(7, 6, 4), (4, 3, 3), (9, 7, 5)]:
+            number_of_games = 64
+            batch = BatchConnectX(number_of_games, columns, rows, win_length)
+            matches = [ConnectXMatch(columns, rows, win_length, "X", "O") for _ in range(number_of_games)]
+            while not batch.done.all():
+                moves = batch.random_legal_moves(rng)
+                # Make some of the moves illegal
+                moves = np.where(rng.random(number_of_games) < 0.02, columns, moves)
+                legal, win, draw, done = batch.step(moves)
+                for index, match in enumerate(matches):
+                    if match.game_state != GameState.IN_PROGRESS:
+                        assert not legal[index] and done[index]
+                        continue
+                    match.play_with_next_player(int(moves[index]))
+                    assert legal[index] == (match.game_state != GameState.ILLEGAL_MOVE)
+                    assert win[index] == (match.game_state == GameState.WIN)
+                    assert draw[index] == (match.game_state == GameState.DRAW)
+                    assert done[index] == (match.game_state != GameState.IN_PROGRESS)
+            for index, match in enumerate(matches):
+                expected_winner = {None: 0, "X": 1, "O": 2}[match.winner]
+                assert batch.winners[index] == expected_winner
+                assert np.array_equal(batch.boards[index], match._cells)
+
+    def test_play_random_games_and_reset(self):
+        batch = BatchConnectX(100, 7, 6, 4)
+        winners = batch.play_random_games(np.random.default_rng(1))
+        assert batch.done.all()
+        assert set(winners) <= {0, 1, 2}
+        batch.reset(np.arange(50))
+        assert not batch.done[:50].any()
+        assert batch.done[50:].all()
+        assert batch.legal_moves_mask()[:50].all()
+        assert not batch.legal_moves_mask()[50:].any()
+
+
 def agent_first_column(board, win_length, opponent_name):
     # Simple agent that always picks the first available column
     return 0
@@ -352,6 +733,19 @@ def agent_last_column(board, win_length, opponent_name):
     # Simple agent that always picks the last available column
     return board.shape[0] - 1
         
+def random_legal_column(board, win_length, opponent_name):
+    return random.choice([col for col in range(board.shape[0]) if board[col][-1] is None])
+
+def agent_first_column_as_float(board, win_length, opponent_name):
+    # Floats that hold an integer are legal columns
+    return np.float64(0)
+
+def agent_first_column_slow_start(board, win_length, opponent_name):
+    # Takes its time on the empty board, so the games it starts finish last
+    if all(cell is None for cell in board.ravel()):
+        time.sleep(0.3)
+    return 0
+
 def agent_empty(board, win_length, opponent_name):
     # Finds the first empty column and plays there
     # Otherwise random
@@ -467,6 +861,47 @@ class TestConnectXMatchWithAgents:
         )
         assert match.play_full_game() == "agent_2"
         
+    def test_numeric_observation_agents(self):
+        received = []
+
+        @numeric_observation
+        def numeric_agent(observation, win_length, opponent_name):
+            received.append(observation)
+            return int(np.flatnonzero(observation.legal_moves)[0])
+
+        for enable_thread_protection in [True, False]:
+            received.clear()
+            match = ConnectXMatchWithAgents(7, 6, 4, "X", "O", numeric_agent, agent_last_column, 5, enable_thread_protection)
+            assert match.play_full_game() == "X"
+            assert all(isinstance(observation, NumericObservation) for observation in received)
+            # Observations share the buffer of the match, which the final state call shows
+            assert received[0].board[0].tolist() == [1, 1, 1, 1, 0, 0]
+            assert received[0].board[6].tolist() == [-1, -1, -1, 0, 0, 0]
+
+    def test_move_timings(self):
+        def slow_agent(board, win_length, opponent_name):
+            time.sleep(0.01)
+            return 0
+
+        for enable_thread_protection in [True, False]:
+            match = ConnectXMatchWithAgents(7, 6, 4, "X", "O", slow_agent, agent_last_column, 5, enable_thread_protection)
+            match.play_full_game()
+            # One entry per move, the final state calls are not timed
+            assert [player for player, _, _ in match.game.move_timings] == [player for player, _ in match.game.moves_played]
+            assert all(wall_time >= 0.01 for player, wall_time, _ in match.game.move_timings if player == "X")
+            # Sleeping does not use CPU time
+            assert all(cpu_time < 0.01 for _, _, cpu_time in match.game.move_timings)
+
+        def busy_agent(board, win_length, opponent_name):
+            time.sleep(1)
+            return 0
+
+        match = ConnectXMatchWithAgents(7, 6, 4, "X", "O", busy_agent, agent_last_column, 0.05)
+        match.play_full_game()
+        _, wall_time, cpu_time = match.game.move_timings[0]
+        assert wall_time >= 0.05
+        assert cpu_time is None
+
     def test_agents_receive_final_state(self):
         """Test that agents receive the final state after the game is finished."""
         # Create counters to track how many times each agent is called
@@ -907,6 +1342,65 @@ class TestTournament:
         assert len(tournament.meta_matchups) == 3
         assert tournament.overall_winner == 'NO_CLEAR_WINNER'
 
+    def test_checkpoint_and_resume(self, tmp_path):
+        checkpoint_path = str(tmp_path / "checkpoint.jsonl")
+        games_started = [0]
+
+        def counting_agent(board, win_length, opponent_name):
+            if all(cell is None for cell in board.ravel()):
+                games_started[0] += 1
+            return 0
+
+        agents = [Agent("Agent1", counting_agent), Agent("Agent2", agent_last_column), Agent("Agent3", agent_empty)]
+
+        def new_tournament() -> Tournament:
+            return Tournament([BoardDimension(7, 6)], [4, 5], agents, 5, 10, 4)
+
+        tournament = new_tournament()
+        tournament.play_tournament(checkpoint_path=checkpoint_path)
+        with open(checkpoint_path) as file:
+            lines = file.readlines()
+        # 3 meta matchups of 2 matchups of 4 games
+        assert len(lines) == 24
+
+        # A run killed after 10 games, in the middle of writing the 11th
+        with open(checkpoint_path, "w") as file:
+            file.writelines(lines[:10])
+            file.write(lines[10][:20])
+        games_started[0] = 0
+        resumed_tournament = new_tournament()
+        resumed_tournament.play_tournament(checkpoint_path=checkpoint_path, resume=True)
+        # Only the games from the 11th on are played again, 6 games of Agent1, which starts the games of even index
+        assert games_started[0] == 3
+        assert resumed_tournament.agents_metamatchup_wins == tournament.agents_metamatchup_wins
+        for meta_matchup, resumed_meta_matchup in zip(tournament.meta_matchups, resumed_tournament.meta_matchups):
+            assert resumed_meta_matchup.overall_first_player_wins == meta_matchup.overall_first_player_wins
+            assert resumed_meta_matchup.overall_second_player_wins == meta_matchup.overall_second_player_wins
+            for matchup, resumed_matchup in zip(meta_matchup.matchups, resumed_meta_matchup.matchups):
+                name = matchup.second_agent.name
+                assert len(resumed_matchup.latency_stats[name]) == len(matchup.latency_stats[name])
+                assert resumed_matchup.saved_player_1_games == matchup.saved_player_1_games
+        with open(checkpoint_path) as file:
+            assert len([json.loads(line) for line in file]) == 24
+
+        # Resuming a finished tournament plays nothing
+        games_started[0] = 0
+        new_tournament().play_tournament(checkpoint_path=checkpoint_path, resume=True)
+        assert games_started[0] == 0
+        # Without resume, the checkpoint starts again
+        new_tournament().play_tournament(checkpoint_path=checkpoint_path)
+        assert games_started[0] == 8
+
+        # Games of another seed or of another function under the same name are played again rather than mixed in
+        games_started[0] = 0
+        Tournament([BoardDimension(7, 6)], [4, 5], agents, 5, 10, 4, seed=3).play_tournament(checkpoint_path=checkpoint_path, resume=True)
+        assert games_started[0] == 8
+        other_agents = [Agent("Agent1", counting_agent), Agent("Agent2", agent_first_column), Agent("Agent3", agent_empty)]
+        other_tournament = Tournament([BoardDimension(7, 6)], [4, 5], other_agents, 5, 10, 4)
+        other_tournament.play_tournament(checkpoint_path=checkpoint_path, resume=True)
+        # The meta matchups of Agent2 are played again, 4 of their games started by Agent1
+        assert games_started[0] == 8 + 4
+
     def test_generate_report(self):
         board_dimensions = [BoardDimension(7, 6), BoardDimension(8, 7)]
         win_lengths = [4, 5]
@@ -1036,7 +1530,7 @@ class TestConnectXMatchup:
         time_limit = 5
         
         # Test first agent starting
-        winner, game = Matchup._play_single_game(
+        winner, record = Matchup._play_single_game(
             game_index=0,
             board_dimension=board_dim,
             win_length=win_length,
@@ -1046,6 +1540,7 @@ class TestConnectXMatchup:
             enable_thread_protection=True,
             start_with_first_agent=True
         )
+        game = record.to_match()
         
         # agent_1 (agent_first_column) should win consistently
         assert winner == "agent_1"
@@ -1054,7 +1549,7 @@ class TestConnectXMatchup:
         assert game.SECOND_PLAYER_NAME == "agent_2"
         
         # Test second agent starting
-        winner, game = Matchup._play_single_game(
+        winner, record = Matchup._play_single_game(
             game_index=1,
             board_dimension=board_dim,
             win_length=win_length,
@@ -1064,6 +1559,7 @@ class TestConnectXMatchup:
             enable_thread_protection=True,
             start_with_first_agent=False
         )
+        game = record.to_match()
         
         # agent_1 should still win but will be the second player this time
         assert winner == "agent_1"
@@ -1072,7 +1568,7 @@ class TestConnectXMatchup:
         assert game.SECOND_PLAYER_NAME == "agent_1"
         
         # Test with thread protection disabled
-        winner, game = Matchup._play_single_game(
+        winner, record = Matchup._play_single_game(
             game_index=2,
             board_dimension=board_dim,
             win_length=win_length,
@@ -1082,11 +1578,330 @@ class TestConnectXMatchup:
             enable_thread_protection=False,
             start_with_first_agent=True
         )
+        game = record.to_match()
         
         # Should still work without thread protection
         assert winner == "agent_1"
         assert game.winner == "agent_1"
 
+    def test_play_n_games_adaptive(self):
+        # agent_1 wins every game, so the verdict is settled long before the maximum
+        matchup = Matchup(BoardDimension(7, 6), 4, Agent("agent_1", agent_first_column), Agent("agent_2", agent_empty), 5, 10)
+        games_played = matchup.play_n_games_adaptive(1000, error_rate=0.05)
+        assert games_played <= 40
+        assert games_played % 2 == 0
+        assert matchup.first_player_wins == games_played
+        assert matchup.winner == "agent_1"
+        assert f"Adaptive Stopping: {games_played} of at most 1000 games played" in matchup.get_report_lines()
+
+        # The starting agent always wins, so the agents are even
+        matchup = Matchup(BoardDimension(7, 6), 4, Agent("agent_1", agent_first_column), Agent("agent_2", agent_last_column), 5, 80)
+        games_played = matchup.play_n_games_adaptive(1000, error_rate=0.05)
+        assert games_played < 1000
+        assert matchup.winner == 'NO CLEAR WINNER. The difference in win percentage is less than the threshold.'
+
+        # Without enough games, play stops at the maximum
+        matchup = Matchup(BoardDimension(7, 6), 4, Agent("agent_1", agent_first_column), Agent("agent_2", agent_empty), 5, 10)
+        assert matchup.play_n_games_adaptive(7) == 6
+        assert matchup.first_player_wins == 6
+
+    def test_resume_play_n_games_adaptive(self, tmp_path):
+        checkpoint_path = str(tmp_path / "checkpoint.jsonl")
+
+        def play(resume: bool) -> Matchup:
+            checkpoint = GameCheckpoint(checkpoint_path, resume)
+            meta_matchup = MetaMatchup(
+                [BoardDimension(7, 6)], [4], Agent("agent_1", agent_first_column), Agent("agent_2", agent_empty), 5, 10, 1000,
+                adaptive_error_rate=0.05, checkpoint=checkpoint
+            )
+            meta_matchup.play_matchups()
+            checkpoint.close()
+            return meta_matchup.matchups[0]
+
+        def checkpoint_lines() -> list:
+            with open(checkpoint_path) as file:
+                return file.readlines()
+
+        games_played = play(resume=False).first_player_wins
+        assert games_played <= 40
+        lines = checkpoint_lines()
+        assert len(lines) == games_played
+
+        # A matchup that had stopped plays no more games
+        matchup = play(resume=True)
+        assert matchup.first_player_wins == games_played
+        assert matchup.winner == "agent_1"
+        assert checkpoint_lines() == lines
+
+        # Only the missing game of an incomplete pair is played, and the pair keeps its starting agents
+        with open(checkpoint_path, "w") as file:
+            file.writelines(lines[:3] + lines[4:])
+        matchup = play(resume=True)
+        assert matchup.first_player_wins == games_played
+        assert len(checkpoint_lines()) == games_played
+        replayed_record = json.loads(checkpoint_lines()[-1])["record"]
+        assert replayed_record["game_index"] == json.loads(lines[3])["record"]["game_index"] == 3
+        assert replayed_record["first_player_name"] == "agent_2"
+
+    def test_pair_sequential_test(self):
+        # Winning 40 of 40 games settles the verdict at a threshold of 10%
+        sequential_test = PairSequentialTest(0.1, 0.05)
+        verdicts = [sequential_test.add_pair(2) for _ in range(20)]
+        assert PairSequentialTest.FIRST_AGENT in verdicts
+        assert set(verdicts[:verdicts.index(PairSequentialTest.FIRST_AGENT)]) == {None}
+
+        sequential_test = PairSequentialTest(0.1, 0.05)
+        verdicts = [sequential_test.add_pair(0) for _ in range(20)]
+        assert PairSequentialTest.SECOND_AGENT in verdicts
+
+        # Later pairs that move the evidence back withdraw the verdict, which always agrees with the mean pair score
+        points = [2] * 12 + [0] * 12
+        sequential_test = PairSequentialTest(0.1, 0.05)
+        verdicts = []
+        for pairs, first_agent_points in enumerate(points, start=1):
+            verdicts.append(sequential_test.add_pair(first_agent_points))
+            if verdicts[-1] == PairSequentialTest.FIRST_AGENT:
+                assert sum(points[:pairs]) / (2 * pairs) > 0.55
+        assert PairSequentialTest.FIRST_AGENT in verdicts and verdicts[-1] is None
+
+        # Even agents give no clear winner once both boundaries are excluded
+        sequential_test = PairSequentialTest(0.1, 0.05)
+        verdicts = [sequential_test.add_pair(1) for _ in range(500)]
+        assert set(verdicts) == {None, PairSequentialTest.NO_CLEAR_WINNER}
+
+        # A first agent exactly at the threshold is rarely called the winner
+        rng = np.random.default_rng(0)
+        wrong_verdicts = 0
+        for _ in range(200):
+            sequential_test = PairSequentialTest(0.2, 0.1)
+            verdict = None
+            while verdict is None and sequential_test.pairs < 300:
+                # Wins with probability 0.6, loses with probability 0.4 in each game
+                verdict = sequential_test.add_pair(float((rng.random(2) < 0.6).sum()))
+            wrong_verdicts += verdict == PairSequentialTest.FIRST_AGENT
+        assert wrong_verdicts <= 200 * 0.05 + 5
+
+        with pytest.raises(Exception):
+            PairSequentialTest(1.0, 0.05)
+
+    def test_game_executor(self, tmp_path):
+        pid_file = str(tmp_path / "pids.txt")
+
+        def pid_agent(board, win_length, opponent_name):
+            with open(pid_file, "a") as file:
+                file.write(f"{os.getpid()}\n")
+            return 0
+
+        agent_1 = Agent("agent_1", pid_agent)
+        agent_2 = Agent("agent_2", agent_empty)
+        slow_agent = Agent("slow", agent_first_column_slow_start)
+        with GameExecutor([agent_1, agent_2, slow_agent], num_processes=2) as executor:
+            for _ in range(3):
+                matchup = Matchup(BoardDimension(7, 6), 4, agent_1, agent_2, 5, 10, executor=executor)
+                matchup.play_n_games_with_parallelism(6)
+                assert matchup.first_player_wins == 6
+                assert len(matchup.saved_player_1_games) == 5
+            matchup = Matchup(BoardDimension(7, 6), 4, agent_1, agent_2, 5, 10, executor=executor)
+            matchup.play_n_games_streaming(4)
+            assert matchup.first_player_wins == 4
+
+            # Adaptive play also runs in the workers, a pair for each two of them
+            meta_matchup = MetaMatchup([BoardDimension(7, 6)], [4], agent_1, agent_2, 5, 10, 1000, adaptive_error_rate=0.05, executor=executor)
+            meta_matchup.play_matchups()
+            games_played = meta_matchup.matchups[0].first_player_wins
+            assert 0 < games_played <= 40
+            assert meta_matchup.overall_winner == "agent_1"
+
+            # Every matchup was played by the same two workers
+            with open(pid_file) as file:
+                pids = set(file.read().split())
+            assert len(pids) <= 2
+            assert str(os.getpid()) not in pids
+
+            matchup = Matchup(BoardDimension(7, 6), 4, agent_1, Agent("unknown", agent_empty), 5, 10, executor=executor)
+            with pytest.raises(Exception):
+                matchup.play_n_games_with_parallelism(2)
+            # A registered name with another function is refused too
+            matchup = Matchup(BoardDimension(7, 6), 4, Agent("agent_1", agent_first_column), agent_2, 5, 10, executor=executor)
+            with pytest.raises(Exception):
+                matchup.play_n_games_with_parallelism(2)
+
+            # Games are counted in game order, whichever finishes first
+            matchup = Matchup(BoardDimension(7, 6), 4, slow_agent, agent_2, 5, 10, executor=executor)
+            matchup.play_n_games_with_parallelism(4)
+            assert [game.FIRST_PLAYER_NAME for game in matchup.saved_player_1_games] == ["slow", "agent_2"] * 2
+
+            tournament = Tournament([BoardDimension(7, 6)], [4], [agent_1, agent_2], 5, 10, 4, executor=executor)
+            tournament.play_tournament()
+            assert tournament.overall_winner == "agent_1"
+            assert tournament.meta_matchups[0].overall_total_games == 4
+
+    def test_seeded_games(self):
+        first_agent = Agent("agent_1", random_legal_column)
+        second_agent = Agent("agent_2", random_legal_column)
+        matchup = Matchup(BoardDimension(7, 6), 4, first_agent, second_agent, 5, 10, seed=7)
+        matchup.play_n_games(6)
+        matchup.play_n_games(4)
+        assert matchup.games_started == 10
+        replayed_games = [matchup.replay_game(game_index) for game_index in range(10)]
+        assert sum(game.winner == "agent_1" for game in replayed_games) == matchup.first_player_wins
+        assert sum(game.winner == "agent_2" for game in replayed_games) == matchup.second_player_wins
+        # The first agent starts the games of even index
+        assert [game.FIRST_PLAYER_NAME for game in replayed_games[:2]] == ["agent_1", "agent_2"]
+        assert matchup.replay_game(3).moves_played == replayed_games[3].moves_played
+        assert len({tuple(game.moves_played) for game in replayed_games}) > 1
+
+        # The same games in parallel, whatever worker plays them
+        parallel_matchup = Matchup(BoardDimension(7, 6), 4, first_agent, second_agent, 5, 10, seed=7)
+        parallel_matchup.play_n_games_with_parallelism(10, num_processes=2)
+        assert parallel_matchup.first_player_wins == matchup.first_player_wins
+        assert parallel_matchup.second_player_wins == matchup.second_player_wins
+        saved_moves = {tuple(game.moves_played) for game in parallel_matchup.saved_player_1_games + parallel_matchup.saved_player_2_games}
+        assert saved_moves <= {tuple(game.moves_played) for game in replayed_games}
+
+        # Another master seed gives other games
+        other_matchup = Matchup(BoardDimension(7, 6), 4, first_agent, second_agent, 5, 10, seed=8)
+        assert other_matchup.replay_game(3).moves_played != replayed_games[3].moves_played
+        with pytest.raises(Exception):
+            Matchup(BoardDimension(7, 6), 4, first_agent, second_agent, 5, 10).replay_game(0)
+
+    def test_game_record(self, tmp_path):
+        def string_agent(board, win_length, opponent_name):
+            return "a"
+
+        def error_agent(board, win_length, opponent_name):
+            raise ValueError("no move")
+
+        def busy_agent(board, win_length, opponent_name):
+            time.sleep(1)
+            return 0
+
+        record_sizes = []
+        for first_player_func, second_player_func, time_limit in [
+            (agent_first_column, agent_last_column, 5),
+            (agent_first_column_as_float, agent_last_column, 5),
+            (agent_first_column, string_agent, 5),
+            (agent_first_column, error_agent, 5),
+            (agent_first_column, busy_agent, 0.05)
+        ]:
+            match = ConnectXMatchWithAgents(7, 6, 4, "X", "O", first_player_func, second_player_func, time_limit)
+            match.play_full_game()
+            record = GameRecord.from_match(match.game)
+            record = pickle.loads(pickle.dumps(record))
+            assert record.moves.itemsize == 1
+            rebuilt_game = record.to_match()
+            assert rebuilt_game == match.game
+            assert rebuilt_game.game_state == match.game.game_state
+            assert rebuilt_game.moves_played == match.game.moves_played
+            assert rebuilt_game.log == match.game.log
+            assert rebuilt_game.move_timings == match.game.move_timings
+            record_sizes.append((len(pickle.dumps(record)), len(pickle.dumps(match.game))))
+        # The compact record of a full game is much smaller than the match
+        assert record_sizes[0][0] < record_sizes[0][1] / 2
+
+        # Wide boards get wider moves
+        match = ConnectXMatchWithAgents(300, 2, 2, "X", "O", agent_last_column, agent_first_column, 5)
+        match.play_full_game()
+        record = GameRecord.from_dict(json.loads(json.dumps(GameRecord.from_match(match.game).to_dict())))
+        assert record.moves.itemsize == 2
+        assert list(record.moves) == [299, 0, 299]
+        assert record.to_match() == match.game
+
+        # Games of float columns are recorded by pool workers and checkpoints
+        checkpoint = GameCheckpoint(str(tmp_path / "games.jsonl"))
+        matchup = Matchup(
+            BoardDimension(7, 6), 4, Agent("agent_1", agent_first_column_as_float), Agent("agent_2", agent_last_column), 5, 10,
+            checkpoint=checkpoint
+        )
+        matchup.play_n_games_with_parallelism(2, num_processes=2)
+        checkpoint.close()
+        assert matchup.first_player_wins == 1
+        assert matchup.second_player_wins == 1
+        assert len(GameCheckpoint(checkpoint.file_path, resume=True)) == 2
+
+    def test_latency_report(self):
+        matchup = Matchup(BoardDimension(7, 6), 4, Agent("agent_1", agent_first_column), Agent("agent_2", agent_last_column), 5, 10)
+        matchup.play_n_games(2)
+        # The starting agent wins each game in 4 moves
+        assert len(matchup.latency_stats["agent_1"]) == 7
+        assert len(matchup.latency_stats["agent_2"]) == 7
+        report_lines = matchup.get_report_lines()
+        assert "Move Latency:" in report_lines
+        assert any(line.startswith("  Wall time: p50") for line in report_lines)
+        assert any(line.startswith("  Headroom: ") for line in report_lines)
+
+        stats = LatencyStats()
+        assert stats.get_report_lines("agent", 1.0) == ["agent: no moves timed"]
+        stats.merge(matchup.latency_stats["agent_1"])
+        stats.merge(matchup.latency_stats["agent_2"])
+        assert len(stats) == 14
+        assert any(line.startswith("  Wall time p95 by board fill: 0-33%") for line in stats.get_report_lines("agent", 1.0))
+
+    def test_play_n_games_concurrently(self):
+        async def waiting_first_column(board, win_length, opponent_name):
+            await asyncio.sleep(0.05)
+            return 0
+
+        matchup = Matchup(BoardDimension(7, 6), 4, Agent("agent_1", waiting_first_column), Agent("agent_2", agent_last_column), 5, 10)
+        start = time.perf_counter()
+        matchup.play_n_games_concurrently(40)
+        # 40 games of up to 4 waiting moves each would take 8 seconds one after the other
+        assert time.perf_counter() - start < 4
+        assert matchup.first_player_wins == 20
+        assert matchup.second_player_wins == 20
+        assert matchup.percentage_first_player_wins == 50.0
+        assert len(matchup.saved_player_1_games) == 5
+        assert len(matchup.latency_stats["agent_1"]) == 140
+
+    def test_play_n_games_concurrently_timeouts_and_errors(self):
+        async def late_agent(board, win_length, opponent_name):
+            await asyncio.sleep(1)
+            return 0
+
+        def busy_agent(board, win_length, opponent_name):
+            time.sleep(1)
+            return 0
+
+        def error_agent(board, win_length, opponent_name):
+            raise ValueError("no move")
+
+        for failing_func, game_state in [
+            (late_agent, GameState.TIME_LIMIT_EXCEEDED),
+            (busy_agent, GameState.TIME_LIMIT_EXCEEDED),
+            (error_agent, GameState.AGENT_ERROR)
+        ]:
+            matchup = Matchup(BoardDimension(7, 6), 4, Agent("failing", failing_func), Agent("normal", agent_last_column), 0.1, 10)
+            matchup.play_n_games_concurrently(4)
+            assert matchup.second_player_wins == 4
+            assert all(game.game_state == game_state for game in matchup.saved_player_2_games)
+            assert all(game.winner == "normal" for game in matchup.saved_player_2_games)
+        assert "caused an error" in matchup.saved_player_2_games[0].log[-1]
+
+    def test_play_n_games_concurrently_slow_agent_does_not_delay_others(self):
+        def slow_agent(board, win_length, opponent_name):
+            time.sleep(0.5)
+            return 0
+
+        # Threads of timed out moves keep running, and the moves of the fast agent must not wait for them
+        matchup = Matchup(BoardDimension(7, 6), 4, Agent("slow", slow_agent), Agent("fast", agent_last_column), 0.1, 10)
+        matchup.play_n_games_concurrently(8, max_concurrent_games=2)
+        assert matchup.second_player_wins == 8
+        assert all(game.game_state == GameState.TIME_LIMIT_EXCEEDED for game in matchup.saved_player_2_games)
+        assert all("slow exceeded the time limit" in game.log[-1] for game in matchup.saved_player_2_games)
+
+    def test_play_n_games_streaming(self):
+        matchup = Matchup(BoardDimension(7, 6), 4, Agent("agent_1", agent_first_column), Agent("agent_2", agent_empty), 5, 10)
+        progress = []
+        matchup.play_n_games_streaming(12, num_processes=2, chunksize=3, progress_callback=lambda done, total: progress.append((done, total)))
+        assert progress == [(done, 12) for done in range(1, 13)]
+        assert matchup.first_player_wins == 12
+        assert matchup.percentage_first_player_wins == 100.0
+        assert matchup.winner == "agent_1"
+        # Only the saved games are kept
+        assert len(matchup.saved_player_1_games) == 5
+        assert len(matchup.saved_player_2_games) == 0
+        assert len(matchup.latency_stats["agent_1"]) == 12 * 4
+
     def test_play_n_games_with_parallelism(self):
         """Test the play_n_games_with_parallelism method."""
         board_dim = BoardDimension(7, 6)
@@ -1131,6 +1946,11 @@ class TestConnectXMatchup:
         assert matchup.draws == 0
         assert matchup.percentage_first_player_wins == 100.0
         assert matchup.winner == "agent_1"
+
+        # Games are counted in game order, whichever finishes first
+        matchup = Matchup(board_dim, 4, Agent("agent_1", agent_first_column_slow_start), agent_2, 5, 10)
+        matchup.play_n_games_with_parallelism(4, num_processes=2)
+        assert [game.FIRST_PLAYER_NAME for game in matchup.saved_player_1_games] == ["agent_1", "agent_2"] * 2
         
         # Test with equal strategies
         board_dim = BoardDimension(7, 6)
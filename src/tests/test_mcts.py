@@ -0,0 +1,80 @@
+import random
+import pytest
+
+from src.main.connect import ConnectXMatch, ConnectXMatchWithAgents, GameState
+from src.main.mcts import MCTS, MCTSAgent
+
+
+def random_agent(board, win_length, opponent_name):
+    return random.choice([column for column in range(board.shape[0]) if board[column][-1] is None])
+
+
+class TestMCTS:
+    def test_plays_winning_move(self):
+        match = ConnectXMatch(7, 6, 4, "X", "O")
+        for column in [0, 6, 1, 6, 2, 5]:
+            match.play_with_next_player(column)
+        search = MCTS(rng=random.Random(0))
+        assert search.search(match, iterations=2000) == 3
+        # The searched match is left untouched
+        assert match.move_count == 6
+
+    def test_blocks_losing_move(self):
+        match = ConnectXMatch(7, 6, 4, "X", "O")
+        for column in [0, 6, 1, 6, 2]:
+            match.play_with_next_player(column)
+        search = MCTS(rng=random.Random(0))
+        assert search.search(match, iterations=3000) == 3
+
+    def test_tree_reuse(self):
+        match = ConnectXMatch(7, 6, 4, "X", "O")
+        search = MCTS(rng=random.Random(0))
+        move = search.search(match, iterations=3000)
+        assert search.last_reused_visits == 0
+        match.play_with_next_player(move)
+        match.play_with_next_player(3)
+        search.search(match, iterations=100)
+        # The subtree below the two moves keeps its visits, and the old root is not updated any more
+        assert search.last_reused_visits > 0
+        assert search.visits[0] == 3000
+        assert search.visits[search.root] == search.last_reused_visits + 100
+
+        # A position from another game resets the tree
+        other_match = ConnectXMatch(7, 6, 4, "X", "O")
+        other_match.play_with_next_player(6)
+        search.search(other_match, iterations=10)
+        assert search.last_reused_visits == 0
+        assert search.root == 0
+
+    def test_max_nodes(self):
+        match = ConnectXMatch(7, 6, 4, "X", "O")
+        search = MCTS(max_nodes=500, rng=random.Random(0))
+        move = search.search(match, iterations=3000)
+        # The tree stops growing at the cap, and the search keeps visiting it
+        assert len(search.visits) <= 500
+        assert search.visits[search.root] == 3000
+        match.play_with_next_player(move)
+        match.play_with_next_player(3)
+        # A full tree is not reused
+        search.search(match, iterations=100)
+        assert search.last_reused_visits == 0
+        assert len(search.visits) <= 500
+
+    def test_terminal_position(self):
+        match = ConnectXMatch(7, 6, 4, "X", "O")
+        for column in [0, 6, 1, 6, 2, 5, 3]:
+            match.play_with_next_player(column)
+        assert match.game_state == GameState.WIN
+        assert MCTS().search(match, iterations=10) is None
+        with pytest.raises(Exception):
+            MCTS().search(ConnectXMatch(7, 6, 4, "X", "O"))
+
+
+class TestMCTSAgent:
+    def test_beats_random_agent(self):
+        for first_is_mcts in [True, False]:
+            agent = MCTSAgent("mcts", time_limit_s=0.1)
+            names = ["mcts", "random"] if first_is_mcts else ["random", "mcts"]
+            functions = [agent.play, random_agent] if first_is_mcts else [random_agent, agent.play]
+            match = ConnectXMatchWithAgents(7, 6, 4, names[0], names[1], functions[0], functions[1], 5)
+            assert match.play_full_game() == "mcts"
@@ -0,0 +1,52 @@
+import pickle
+
+from src.main.connect import ConnectXMatch
+from src.main.opening_book import OpeningBook, build_opening_book, enumerate_positions, write_opening_book
+from src.main.solver import Solver, SolverAgent
+
+
+class TestOpeningBook:
+    def test_enumerate_positions(self):
+        positions = enumerate_positions(7, 6, 4, 2)
+        # The empty board, 7 positions after one move and 49 after two moves, of which only (3, 3) is its own mirror image
+        assert len(positions) == 1 + 4 + 25
+        assert len({match.canonical_key()[0] for match in positions}) == len(positions)
+        # Transpositions are merged
+        assert len(enumerate_positions(7, 6, 4, 3)) < 1 + 4 + 25 + 172
+
+    def test_build_and_lookup(self, tmp_path):
+        records = build_opening_book(4, 4, 3, 3, time_limit_s=None)
+        file_path = str(tmp_path / "book.bin")
+        write_opening_book(file_path, records, 4, 4, 3, 3)
+        book = OpeningBook(file_path)
+        assert len(book) == len(records) == len(enumerate_positions(4, 4, 3, 3))
+        assert (book.COLUMNS, book.ROWS, book.WIN_LENGTH, book.PLIES) == (4, 4, 3, 3)
+
+        match = ConnectXMatch(4, 4, 3, "X", "O")
+        match.play_with_next_player(1)
+        move, value, exact = book.lookup(match)
+        assert exact
+        assert value == Solver().solve(match)
+        assert 0 <= move < 4
+
+        # The mirror image gets the mirrored move
+        mirrored_match = ConnectXMatch(4, 4, 3, "X", "O")
+        mirrored_match.play_with_next_player(2)
+        assert book.lookup(mirrored_match) == (3 - move, value, exact)
+
+        # Deeper positions and other geometries are not in the book
+        for column in [1, 2, 2]:
+            match.play_with_next_player(column)
+        assert book.lookup(match) is None
+        assert book.lookup(ConnectXMatch(5, 4, 3, "X", "O")) is None
+        assert book.lookup_key(12345) is None
+
+        # Pickling keeps only the path
+        unpickled = pickle.loads(pickle.dumps(book))
+        assert len(pickle.dumps(book)) < 200
+        assert unpickled.lookup(ConnectXMatch(4, 4, 3, "X", "O")) == book.lookup(ConnectXMatch(4, 4, 3, "X", "O"))
+
+        # The agent answers book positions from the book
+        agent = SolverAgent("X", time_limit_s=0.1, opening_book=book)
+        board = ConnectXMatch(4, 4, 3, "X", "O").get_board_copy()
+        assert agent.play(board, 3, "O") == book.lookup(ConnectXMatch(4, 4, 3, "X", "O"))[0]
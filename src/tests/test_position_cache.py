@@ -0,0 +1,72 @@
+import multiprocessing as mp
+import pickle
+
+from src.main.connect import ConnectXMatch
+from src.main.position_cache import CACHE_RECORD, PositionCache
+from src.main.solver import Solver
+
+
+def fill_cache(cache: PositionCache, first_column: int) -> int:
+    # Store the positions after each second move following a first move in first_column
+    for column in range(7):
+        match = ConnectXMatch(7, 6, 4, "X", "O")
+        match.play_with_next_player(first_column)
+        match.play_with_next_player(column)
+        cache.put(match, abs(first_column - column), column)
+    return len(cache)
+
+
+class TestPositionCache:
+    def test_put_get_and_reopen(self, tmp_path):
+        file_path = str(tmp_path / "cache.bin")
+        cache = PositionCache(file_path)
+        match = ConnectXMatch(7, 6, 4, "X", "O")
+        match.play_with_next_player(3)
+        assert cache.get(match) is None
+        cache.put(match, -5, 2)
+        # Existing values are not written again
+        cache.put(match, 7, 1)
+        assert cache.get(match) == (-5, 2)
+        assert match in cache
+        # Same position hash on another geometry
+        assert cache.get(ConnectXMatch(7, 6, 5, "X", "O").takeAction(3)) is None
+        cache.close()
+
+        reopened = PositionCache(file_path)
+        assert len(reopened) == 1
+        assert reopened.get(match) == (-5, 2)
+        # A record cut short by a crash is ignored
+        with open(file_path, "ab") as file:
+            file.write(b"\x01\x02\x03")
+        assert PositionCache(file_path).refresh() == 0
+        assert len(pickle.dumps(reopened)) < 200
+        assert pickle.loads(pickle.dumps(reopened)).get(match) == (-5, 2)
+
+    def test_concurrent_writers(self, tmp_path):
+        cache = PositionCache(str(tmp_path / "cache.bin"))
+        with mp.Pool(4) as pool:
+            pool.starmap(fill_cache, [(cache, first_column) for first_column in range(7)])
+        # Records written by the workers are picked up on a miss
+        match = ConnectXMatch(7, 6, 4, "X", "O")
+        match.play_with_next_player(4)
+        match.play_with_next_player(5)
+        assert cache.get(match) == (1, 5)
+        # Mirror images share a record, whichever worker wrote it
+        mirrored_match = ConnectXMatch(7, 6, 4, "X", "O")
+        mirrored_match.play_with_next_player(2)
+        mirrored_match.play_with_next_player(1)
+        assert cache.get(mirrored_match) == (1, 1)
+        assert len(cache) == 25
+        assert (tmp_path / "cache.bin").stat().st_size <= 49 * CACHE_RECORD.size
+
+    def test_solver_uses_cache(self, tmp_path):
+        cache = PositionCache(str(tmp_path / "cache.bin"))
+        match = ConnectXMatch(5, 4, 4, "X", "O")
+        for column in [2, 2, 1, 3]:
+            match.play_with_next_player(column)
+        solver = Solver(position_cache=cache)
+        score = solver.solve(match)
+        assert solver.nodes > 0
+        other_solver = Solver(position_cache=PositionCache(str(tmp_path / "cache.bin")))
+        assert other_solver.solve(match) == score
+        assert other_solver.nodes == 0
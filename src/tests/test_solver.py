@@ -0,0 +1,110 @@
+import random
+import time
+
+from src.main.connect import ConnectXMatch, ConnectXMatchWithAgents, GameState
+from src.main.solver import Solver, SolverAgent, WIN_SCORE
+
+
+def minimax(match: ConnectXMatch, memo: dict) -> int:
+    # Plain minimax result for the player to move: 1 for a win, 0 for a draw, -1 for a loss
+    if match.game_state == GameState.WIN:
+        return -1
+    if match.game_state == GameState.DRAW:
+        return 0
+    if match.zobrist_hash not in memo:
+        best = -1
+        for column in match.getPossibleActions():
+            with match.try_move(column):
+                best = max(best, -minimax(match, memo))
+        memo[match.zobrist_hash] = best
+    return memo[match.zobrist_hash]
+
+
+def random_agent(board, win_length, opponent_name):
+    return random.choice([column for column in range(board.shape[0]) if board[column][-1] is None])
+
+
+class TestSolver:
+    def test_solve_matches_minimax(self):
+        rng = random.Random(0)
+        for columns, rows, win_length in [(4, 4, 3), (4, 5, 3)]:
+            memo = {}
+            for _ in range(20):
+                match = ConnectXMatch(columns, rows, win_length, "X", "O")
+                for _ in range(rng.randint(0, 6)):
+                    if match.game_state != GameState.IN_PROGRESS:
+                        break
+                    match.play_with_next_player(rng.choice(match.getPossibleActions()))
+                if match.game_state != GameState.IN_PROGRESS:
+                    continue
+                # A small table forces replacements
+                score = Solver(table_size=1 << 8).solve(match)
+                assert (score > 0) - (score < 0) == minimax(match, memo)
+                # A timed search proves the same result
+                solver = Solver(table_size=1 << 8)
+                solver.search(match, time_limit_s=10)
+                assert solver.last_proven
+                assert (solver.last_score > 0) - (solver.last_score < 0) == minimax(match, memo)
+
+    def test_plays_winning_move_and_blocks(self):
+        match = ConnectXMatch(7, 6, 4, "X", "O")
+        for column in [0, 6, 1, 6, 2]:
+            match.play_with_next_player(column)
+        solver = Solver()
+        # O must block
+        assert solver.search(match, time_limit_s=1) == 3
+        match.play_with_next_player(5)
+        assert solver.search(match, time_limit_s=1) == 3
+        assert solver.last_exact
+        assert solver.last_score == WIN_SCORE + 42 - 7
+        # The searched match is left untouched
+        assert match.move_count == 6
+        assert match.zobrist_hash == ConnectXMatch.from_board(match.get_board_copy(), 4, "X", "O").zobrist_hash
+
+    def test_time_limit(self):
+        for columns, rows, win_length in [(7, 6, 4), (30, 30, 8)]:
+            match = ConnectXMatch(columns, rows, win_length, "X", "O")
+            solver = Solver()
+            start = time.perf_counter()
+            column = solver.search(match, time_limit_s=0.2)
+            assert time.perf_counter() - start < 0.5
+            assert 0 <= column < columns
+            assert solver.last_depth >= 1
+        assert Solver().search(match, max_depth=2) is not None
+
+    def test_proves_7x6_midgame_positions(self):
+        # A win at ply 13 and a draw at ply 14, both proven well within a move time of a few seconds
+        for columns, expected_result in [([0, 3, 0, 6, 3, 3, 4, 6, 6, 0, 5, 3, 2], 1), ([0, 4, 4, 4, 6, 4, 2, 3, 4, 0, 6, 1, 5, 1], 0)]:
+            match = ConnectXMatch(7, 6, 4, "X", "O")
+            for column in columns:
+                match.play_with_next_player(column)
+            solver = Solver()
+            start = time.perf_counter()
+            column = solver.search(match, time_limit_s=4)
+            assert time.perf_counter() - start < 4
+            assert solver.last_proven
+            assert (solver.last_score > 0) - (solver.last_score < 0) == expected_result
+            # The move keeps the result
+            match.play_with_next_player(column)
+            reply_solver = Solver()
+            reply_solver.search(match, time_limit_s=4)
+            assert reply_solver.last_proven
+            assert (reply_solver.last_score > 0) - (reply_solver.last_score < 0) == -expected_result
+
+    def test_terminal_position(self):
+        match = ConnectXMatch(7, 6, 4, "X", "O")
+        for column in [0, 6, 1, 6, 2, 5, 3]:
+            match.play_with_next_player(column)
+        assert Solver().search(match) is None
+        assert Solver().solve(match) < 0
+
+
+class TestSolverAgent:
+    def test_beats_random_agent(self):
+        for first_is_solver in [True, False]:
+            agent = SolverAgent("solver", time_limit_s=0.1)
+            names = ["solver", "random"] if first_is_solver else ["random", "solver"]
+            functions = [agent.play, random_agent] if first_is_solver else [random_agent, agent.play]
+            match = ConnectXMatchWithAgents(7, 6, 4, names[0], names[1], functions[0], functions[1], 5)
+            assert match.play_full_game() == "solver"
+        assert agent.as_agent().name == "solver"